@@ -1,40 +1,223 @@
-from dash import Dash, dcc, html
-import requests
-from tabs.location_tab import layout as location_layout
-from tabs.demographic_tab import layout as demographic_layout
-from tabs.peak_hour_tab import layout as peak_hours_layout
-from tabs.referrer_tab import layout as referrer_layout
-from tabs.device_tab import layout as device_layout
-from tabs.summary_tab import layout as summary_layout
-
-app = Dash(__name__)
+import hmac
+import os
+
+import plotly.io as pio
+from dash import Dash, dcc, html, Input, Output
+from flask import Response, abort, request, stream_with_context
+from flask_compress import Compress
+from dataset import approx, export, ingest, shared, snapshot
+from dataset.fetch import Fetcher
+from dataset.refresh import Refresher
+from dataset.source import DataSource
+from dataset.store import Dataset
+from tabs.cache import figure_cache
+from tabs.limits import chart_limits
+from tabs.metrics import callback_metrics
+from tabs.prewarm import Prewarmer
+from tabs.search import dropdown_search
+from tabs import location_tab, demographic_tab, peak_hour_tab, referrer_tab, device_tab, summary_tab
+
+# Tab content is rendered on demand, so callbacks target components missing from the initial layout
+app = Dash(__name__, suppress_callback_exceptions=True)
 server = app.server
 
-def fetch_data():
-    url = 'https://flask-dataset.onrender.com'
-    response = requests.get(url)
-    data = response.json()
+# Dash serializes layouts and callback responses through plotly's encoder; orjson encodes NumPy arrays natively
+pio.json.config.default_engine = 'orjson'
+
+# Responses above COMPRESS_MIN_SIZE bytes are sent brotli-encoded when the browser accepts it, gzip otherwise
+server.config.update(
+    COMPRESS_ALGORITHM=['br', 'gzip'],
+    COMPRESS_MIN_SIZE=int(os.environ.get('COMPRESS_MIN_SIZE', 1024)),
+    COMPRESS_BR_LEVEL=4,
+    COMPRESS_LEVEL=6,
+)
+Compress(server)
+
+dataset_url = os.environ.get('DATASET_URL', 'https://flask-dataset.onrender.com')
+cache_dir = os.environ.get('DATASET_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.dataset-cache'))
+
+fetcher = Fetcher(dataset_url, os.path.join(cache_dir, 'shards'), workers=int(os.environ.get('DATASET_FETCH_WORKERS', 4)))
+
+def fetch_data(current=None):
+    download = fetcher.fetch(current.etag if current is not None else None)
+    if download is None:
+        return current
+    # Parse the body as it arrives and encode it in batches instead of materializing response.json()
+    data = ingest.read_dataset(download.chunks(), etag=download.etag)
+    snapshot.save(data, cache_dir)
     return data
 
-data = fetch_data()
+# Callback results are memoized in memory; FIGURE_CACHE_DIR adds an on-disk tier shared by all workers on the host
+figure_cache.configure(
+    max_entries=int(os.environ.get('FIGURE_CACHE_ENTRIES', 1024)),
+    max_bytes=int(os.environ.get('FIGURE_CACHE_BYTES', 64 << 20)),
+    directory=os.environ.get('FIGURE_CACHE_DIR'),
+)
+
+# APPROXIMATE_ABOVE_ROWS turns on approximate mode: queries that would read more rows than that are answered
+# from a stratified sample (APPROXIMATE_SAMPLE_RATE of each country) and drawn with their error bounds
+approximate_above = os.environ.get('APPROXIMATE_ABOVE_ROWS')
+if approximate_above:
+    approx.settings.configure(
+        max_exact_rows=int(approximate_above),
+        rate=float(os.environ.get('APPROXIMATE_SAMPLE_RATE', 0.01)),
+    )
+
+# DATASET_SHARED_DIR (ideally on tmpfs) exports each snapshot as memory-mapped column files, so workers
+# forked from a preloaded master (see gunicorn.conf.py) all read the same pages instead of private copies
+shared_dir = os.environ.get('DATASET_SHARED_DIR')
+if shared_dir:
+    os.makedirs(shared_dir, exist_ok=True)
+
+source = DataSource(fetch_data, prepare=(lambda data: shared.share(data, shared_dir)) if shared_dir else None)
+exported = shared.current_path(shared_dir) if shared_dir else None
+if exported is not None:
+    cached = shared.attach(exported)
+else:
+    cached = snapshot.load(cache_dir)
+    if cached is not None and shared_dir:
+        cached = shared.share(cached, shared_dir)
+if cached is not None:
+    # Boot from the local snapshot and revalidate it against the endpoint in the background
+    source.publish(cached)
+else:
+    source.refresh()
+
+# Re-fetch on a schedule (DATASET_REFRESH_INTERVAL seconds) and/or on POST /refresh when a token is configured
+refresh_interval = float(os.environ.get('DATASET_REFRESH_INTERVAL', 0))
+refresh_token = os.environ.get('DATASET_REFRESH_TOKEN')
+refresher = Refresher(source, interval=refresh_interval)
+if refresh_interval or refresh_token or cached is not None:
+    refresher.start()
+if cached is not None:
+    refresher.trigger()
+
+def start_worker_threads():
+    # Workers forked from the preloaded master inherit no threads. The master keeps the refresh schedule;
+    # workers map whatever it exports and refresh themselves only on POST /refresh
+    global refresher
+    refresher = Refresher(source)
+    refresher.start()
+    # Only the master warms figures; workers find them in the disk tier instead of each warming every snapshot again
+    if prewarmer is not None:
+        source.unsubscribe(prewarmer)
+    shared.Watcher(source, shared_dir).start()
+
+def check_refresh_token():
+    if not hmac.compare_digest(request.headers.get('X-Refresh-Token', ''), refresh_token):
+        abort(403)
+
+if refresh_token:
+    @server.route('/refresh', methods=['POST'])
+    def trigger_refresh():
+        check_refresh_token()
+        refresher.trigger()
+        return {'version': source.version}, 202
+
+    @server.route('/ingest', methods=['POST'])
+    def ingest_records():
+        # Appends a JSON array of new records to the live snapshot without a full re-fetch
+        check_refresh_token()
+        records = request.get_json(silent=True)
+        try:
+            ingest.check_records(records)
+            appended = Dataset.from_records(records)
+        except (TypeError, ValueError) as error:
+            return {'error': str(error)}, 400
+        data = source.append(appended)
+        # Saved like a fetched snapshot, so a restart boots with the appended rows
+        snapshot.save(data, cache_dir)
+        return {'version': data.version, 'rows': len(data)}
+
+# Query parameters accepted by /export, mapped to the dataset columns the tabs filter on
+export_filters = {
+    'sport': 'Sport',
+    'country': 'Country',
+    'continent': 'Continent',
+    'age': 'Age',
+    'gender': 'Gender',
+    'referrer': 'Referrer',
+    'device': 'User Agents',
+}
+export_formats = {
+    'csv': (export.iter_csv, 'text/csv'),
+    'parquet': (export.iter_parquet, 'application/vnd.apache.parquet'),
+}
+
+@server.route('/export')
+def export_data():
+    # e.g. /export?country=Kenya&sport=Swimming&format=parquet, or &group_by=device for the grouped sums
+    file_format = request.args.get('format', 'csv')
+    group_by = request.args.get('group_by')
+    if file_format not in export_formats or (group_by is not None and group_by not in export_filters):
+        abort(400)
+    filters = {column: request.args[name] for name, column in export_filters.items() if request.args.get(name)}
+    write, mimetype = export_formats[file_format]
+    # The snapshot is pinned for the whole download and written out chunk by chunk as the client reads it
+    data = source.current()
+    chunks = write(data, filters, export_filters.get(group_by))
+    filename = f"viewership{'-by-' + group_by if group_by else ''}.{file_format}"
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers={'Content-Disposition': f'attachment; filename={filename}'})
 
 # Logo image URL
 olympics_logo_url = 'https://upload.wikimedia.org/wikipedia/commons/5/5c/Olympic_rings_without_rims.svg'
 
-app.layout = html.Div([
-    html.Div([
-        html.Img(src=olympics_logo_url, style={'width': '80px', 'height': '80px'}),
-        html.H1("FUNOLYMPIC GAMES 2024", style={'margin-left': '10px', 'font-size': '24px'})
-    ], style={'display': 'flex', 'align-items': 'center'}),
-    dcc.Tabs([
-        dcc.Tab(label='Viewership Distribution by Location', children=location_layout(app, data)),
-        dcc.Tab(label='Viewership Distribution by Demographic', children=demographic_layout(app, data)),
-        dcc.Tab(label='Viewership Distribution by Peak Usage Hours', children=peak_hours_layout(app, data)),
-        dcc.Tab(label='Viewership Distribution by Referrer', children=referrer_layout(app, data)),
-        dcc.Tab(label='Viewership Distribution by Device', children=device_layout(app, data)),
-        dcc.Tab(label='Summary Distribution', children=summary_layout(app, data)),
+tabs = {
+    'location': ('Viewership Distribution by Location', location_tab),
+    'demographic': ('Viewership Distribution by Demographic', demographic_tab),
+    'peak-hour': ('Viewership Distribution by Peak Usage Hours', peak_hour_tab),
+    'referrer': ('Viewership Distribution by Referrer', referrer_tab),
+    'device': ('Viewership Distribution by Device', device_tab),
+    'summary': ('Summary Distribution', summary_tab),
+}
+
+# TOP_N_REFERRER, TOP_N_DEVICE and TOP_N_COUNTRY cap the slices of each chart; the rest is shown as 'Other'
+for chart in chart_limits:
+    limit = os.environ.get(f'TOP_N_{chart.upper()}')
+    if limit:
+        chart_limits[chart] = int(limit)
+
+# Dropdowns with more than DROPDOWN_SEARCH_ABOVE options load the rest through server-side prefix search
+if os.environ.get('DROPDOWN_SEARCH_ABOVE'):
+    dropdown_search['above'] = int(os.environ['DROPDOWN_SEARCH_ABOVE'])
+
+# CALLBACK_METRICS=1 times every tab callback and serves the histograms on GET /metrics
+if os.environ.get('CALLBACK_METRICS'):
+    callback_metrics.instrument(app, source)
+
+# Every callback is registered up front; only the selected tab's components are built and sent
+for _, tab in tabs.values():
+    tab.register_callbacks(app, source)
+
+# FIGURE_CACHE_PREWARM_WORKERS processes compute every dropdown combination's figures after each load,
+# so first clicks are answered from the cache. With a preloaded master that needs FIGURE_CACHE_DIR, since
+# the figures are warmed in the master and workers only see them on disk
+prewarm_workers = int(os.environ.get('FIGURE_CACHE_PREWARM_WORKERS', 0))
+prewarmer = None
+if prewarm_workers:
+    prewarmer = Prewarmer(figure_cache, source, prewarm_workers)
+    source.subscribe(prewarmer)
+    prewarmer(source.current())
+
+@app.callback(
+    Output('tab-content', 'children'),
+    [Input('tabs', 'value')]
+)
+def render_tab(selected_tab):
+    return tabs[selected_tab][1].layout(source)
+
+def serve_layout():
+    return html.Div([
+        html.Div([
+            html.Img(src=olympics_logo_url, style={'width': '80px', 'height': '80px'}),
+            html.H1("FUNOLYMPIC GAMES 2024", style={'margin-left': '10px', 'font-size': '24px'})
+        ], style={'display': 'flex', 'align-items': 'center'}),
+        dcc.Store(id='country-continent-map', data=source.current().dimensions.client_map()),
+        dcc.Tabs(id='tabs', value='location', children=[dcc.Tab(label=label, value=value) for value, (label, _) in tabs.items()]),
+        html.Div(id='tab-content')
     ])
-])
+
+app.layout = serve_layout
 
 if __name__ == '__main__':
     app.run_server(debug=True)
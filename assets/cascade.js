@@ -0,0 +1,20 @@
+// Country -> continent cascades resolved in the browser from the map in the 'country-continent-map' store
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    cascade: {
+        continentOf: function(country, lookup) {
+            if (!country || !lookup) {
+                return null;
+            }
+            return lookup.countries[country] || null;
+        },
+        continentOptions: function(country, lookup) {
+            if (!lookup) {
+                return [];
+            }
+            var continent = country ? lookup.countries[country] : null;
+            return lookup.continents
+                .filter(function(candidate) { return !country || candidate === continent; })
+                .map(function(candidate) { return {label: candidate, value: candidate}; });
+        }
+    }
+});
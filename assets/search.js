@@ -0,0 +1,11 @@
+// Keystrokes of dropdowns searched on the server, forwarded to the store beside them (see tabs/search.py)
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    search: {
+        forward: function(searchValue) {
+            if (searchValue === undefined || searchValue === null) {
+                return window.dash_clientside.no_update;
+            }
+            return searchValue;
+        }
+    }
+});
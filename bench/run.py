@@ -0,0 +1,199 @@
+import argparse
+import importlib
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+from werkzeug.serving import make_server
+
+from dataset import standin
+from dataset.synthetic import write_json
+
+DEFAULT_ROWS = [10000, 100000, 1000000]
+
+
+def dataset_file(rows, seed, directory):
+    path = os.path.join(directory, f'dataset-{rows}-{seed}.json')
+    if not os.path.exists(path):
+        write_json(path, rows, seed)
+    return path
+
+
+def serve(path):
+    # Local stand-in for the dataset endpoint on a free port
+    server = make_server('127.0.0.1', 0, standin.create_app(path), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}/'
+
+
+def percentiles(samples):
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {'p50_ms': p50 * 1000, 'p95_ms': p95 * 1000, 'p99_ms': p99 * 1000}
+
+
+def _components(node):
+    # Walks Dash's JSON component tree
+    if isinstance(node, dict):
+        if 'props' in node:
+            yield node
+        for value in node.values():
+            yield from _components(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _components(value)
+
+
+def _sample_values(components):
+    # Candidate input values per component id, taken from what the rendered layout offers
+    values = {}
+    for component in components:
+        props = component['props']
+        if 'id' not in props or not isinstance(props['id'], str):
+            continue
+        candidates = [None]
+        if props.get('options'):
+            candidates += [option['value'] if isinstance(option, dict) else option for option in props['options']]
+        elif 'min' in props and 'max' in props:
+            candidates = [[props['min'], props['max']]]
+        elif 'value' in props:
+            candidates = [props['value']]
+        values[props['id']] = candidates
+    return values
+
+
+def _request(dependency, values):
+    output = dependency['output']
+    if output.startswith('..'):
+        outputs = [dict(zip(('id', 'property'), part.rsplit('.', 1))) for part in output[2:-2].split('...')]
+    else:
+        outputs = dict(zip(('id', 'property'), output.rsplit('.', 1)))
+    inputs = [{**item, 'value': values(item)} for item in dependency['inputs']]
+    state = [{**item, 'value': values(item)} for item in dependency.get('state', [])]
+    return {'output': output, 'outputs': outputs, 'inputs': inputs, 'state': state,
+            'changedPropIds': [f"{item['id']}.{item['property']}" for item in dependency['inputs']]}
+
+
+def run_child(rows, seed, repeat, directory, use_cache):
+    path = dataset_file(rows, seed, directory)
+    server, url = serve(path)
+    os.environ['DATASET_URL'] = url
+    os.environ['DATASET_CACHE_DIR'] = tempfile.mkdtemp(prefix='bench-cache-')
+    if not use_cache:
+        os.environ['FIGURE_CACHE_ENTRIES'] = '0'
+
+    started = time.perf_counter()
+    app = importlib.import_module('app')
+    report = {'rows': rows, 'boot_s': time.perf_counter() - started}
+    client = app.server.test_client()
+
+    # Layout construction: the page shell, then each tab rendered on demand
+    samples, sizes = [], []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get('/_dash-layout')
+        samples.append(time.perf_counter() - started)
+        sizes.append(len(response.data))
+    report['layout'] = {**percentiles(samples), 'bytes': max(sizes)}
+
+    dependencies = client.get('/_dash-dependencies').get_json()
+    render = next(dependency for dependency in dependencies if dependency['output'] == 'tab-content.children')
+    tab_ids = [component['props']['value'] for component in _components(client.get('/_dash-layout').get_json())
+               if component.get('type') == 'Tab']
+    components = []
+    report['tabs'] = {}
+    for tab in tab_ids:
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = client.post('/_dash-update-component', json=_request(render, lambda item: tab))
+            samples.append(time.perf_counter() - started)
+        components += list(_components(response.get_json()))
+        report['tabs'][tab] = {**percentiles(samples), 'bytes': len(response.data)}
+    components += list(_components(client.get('/_dash-layout').get_json()))
+    candidates = _sample_values(components)
+
+    rng = random.Random(seed)
+
+    def pick(item):
+        if item['property'] == 'id':
+            return item['id']
+        return rng.choice(candidates.get(item['id'], [None]))
+
+    report['callbacks'] = {}
+    for dependency in dependencies:
+        if dependency.get('clientside_function') or dependency is render:
+            continue
+        samples, sizes, failures = [], [], 0
+        for _ in range(repeat):
+            body = _request(dependency, pick)
+            started = time.perf_counter()
+            response = client.post('/_dash-update-component', json=body)
+            samples.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                failures += 1
+            sizes.append(len(response.data))
+        # One extra traced call for the callback's peak Python/NumPy allocation
+        tracemalloc.start()
+        client.post('/_dash-update-component', json=_request(dependency, pick))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        report['callbacks'][dependency['output']] = {
+            **percentiles(samples), 'max_bytes': max(sizes), 'mean_bytes': sum(sizes) / len(sizes),
+            'peak_alloc_mb': peak / 1e6, 'errors': failures,
+        }
+    report['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    server.shutdown()
+    return report
+
+
+def print_report(report):
+    print(f"\n== {report['rows']:,} rows: boot {report['boot_s']:.2f}s, peak RSS {report['peak_rss_mb']:.0f} MB")
+    print(f"{'target':<72} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'bytes':>9}")
+    rows = [('layout', report['layout'], report['layout']['bytes'])]
+    rows += [(f'tab {tab}', stats, stats['bytes']) for tab, stats in report['tabs'].items()]
+    rows += [(output, stats, stats['max_bytes']) for output, stats in report['callbacks'].items()]
+    for name, stats, size in rows:
+        label = name if len(name) <= 72 else name[:69] + '...'
+        print(f"{label:<72} {stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {size:>9,}")
+        if stats.get('errors'):
+            print(f"{'':<4}{stats['errors']} failed requests")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every tab callback and layout against synthetic data.')
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default=tempfile.gettempdir(), help='where generated datasets are kept between runs')
+    parser.add_argument('--cache', action='store_true', help='leave the figure cache on (measures hits after the first call)')
+    parser.add_argument('--json', help='write the raw report to this file')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # One size per process so imports, caches and peak RSS do not leak between sizes
+        json.dump(run_child(args.rows[0], args.seed, args.repeat, args.data_dir, args.cache), sys.stdout)
+        return
+
+    reports = []
+    for rows in args.rows:
+        command = [sys.executable, '-m', 'bench.run', '--child', '--rows', str(rows), '--repeat', str(args.repeat),
+                   '--seed', str(args.seed), '--data-dir', args.data_dir] + (['--cache'] if args.cache else [])
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        reports.append(json.loads(output))
+        print_report(reports[-1])
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump(reports, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
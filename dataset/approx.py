@@ -0,0 +1,83 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from dataset.schema import MEASURE, match
+
+STRATUM = 'Country'
+Z_95 = 1.96
+
+
+class Settings:
+    def __init__(self):
+        # Approximate answers stay off until configure() sets the row limit above which they are used
+        self.max_exact_rows = None
+        self.rate = 0.01
+        self.minimum = 200
+        self.seed = 0
+
+    def configure(self, max_exact_rows=None, rate=0.01, minimum=200, seed=0):
+        self.max_exact_rows = max_exact_rows
+        self.rate = rate
+        self.minimum = minimum
+        self.seed = seed
+
+    @property
+    def enabled(self):
+        return self.max_exact_rows is not None
+
+
+settings = Settings()
+
+
+class StratifiedSample:
+    def __init__(self, frame, strata, population, sampled):
+        # frame holds the sampled rows; strata their stratum code; population/sampled the N_h and n_h per stratum
+        self.frame = frame
+        self.strata = strata
+        self.population = population
+        self.sampled = sampled
+
+    @classmethod
+    def build(cls, frame, index, rate=0.01, minimum=200, seed=0):
+        # Every country is sampled separately, so country and continent slices are always represented;
+        # countries with fewer than `minimum` rows are kept whole and therefore answered exactly
+        rng = np.random.default_rng(seed)
+        population, sampled, chosen = [], [], []
+        for value in frame[STRATUM].cat.categories:
+            rows = index.postings[STRATUM][value]
+            size = min(len(rows), max(minimum, math.ceil(rate * len(rows))))
+            population.append(len(rows))
+            sampled.append(size)
+            chosen.append(rng.choice(rows, size, replace=False) if size < len(rows) else np.asarray(rows))
+        rows = np.sort(np.concatenate(chosen)) if chosen else np.empty(0, dtype=np.int64)
+        sample = frame.take(rows).reset_index(drop=True)
+        strata = sample[STRATUM].cat.codes.to_numpy().astype(np.int64)
+        return cls(sample, strata, np.array(population, dtype=np.float64), np.array(sampled, dtype=np.float64))
+
+    def estimate(self, column, filters=None):
+        # Stratified estimate of viewership per value of column, with the half-width of its 95% interval
+        mask = match(self.frame, filters or {}) & (self.frame[column].cat.codes.to_numpy() >= 0)
+        groups = self.frame[column].cat.categories
+        codes = self.frame[column].cat.codes.to_numpy()[mask].astype(np.int64)
+        values = self.frame[MEASURE].to_numpy()[mask].astype(np.float64)
+        keys = self.strata[mask] * len(groups) + codes
+        shape = (len(self.population), len(groups))
+        size = shape[0] * shape[1]
+        sums = np.bincount(keys, weights=values, minlength=size).reshape(shape)
+        squares = np.bincount(keys, weights=values * values, minlength=size).reshape(shape)
+        present = np.bincount(codes, minlength=len(groups)) > 0
+
+        # Domain totals: within each stratum, rows outside the group count as zeros
+        n = np.maximum(self.sampled, 1)[:, None]
+        weights = (self.population / np.maximum(self.sampled, 1))[:, None]
+        totals = (weights * sums).sum(axis=0)
+        variance_within = np.where(n > 1, (squares - sums * sums / n) / np.maximum(n - 1, 1), 0.0)
+        finite = (1 - self.sampled / np.maximum(self.population, 1))[:, None]
+        variance = (self.population[:, None] ** 2 * finite * variance_within / n).sum(axis=0)
+
+        index = pd.Index(groups[present], dtype=object, name=column)
+        estimate = pd.Series(np.rint(totals[present]).astype(np.int64), index=index, name=MEASURE)
+        errors = pd.Series(Z_95 * np.sqrt(np.maximum(variance[present], 0)), index=index, name=MEASURE)
+        return estimate, errors
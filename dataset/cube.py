@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+from dataset import scan
+from dataset.schema import MEASURE, match
+
+# Materialized group-bys answering every tab query; anything else rolls up from the raw rows.
+# Peak usage hours are served by the hour index instead
+CUBOIDS = [
+    ['Continent', 'Sport'],
+    ['Country', 'Continent', 'Sport'],
+    ['Country', 'Continent', 'Age'],
+    ['Country', 'Continent', 'Gender'],
+    ['Country', 'Continent', 'Referrer'],
+    ['Country', 'Continent', 'User Agents'],
+]
+
+
+class Cube:
+    def __init__(self, frame, cuboids, index=None):
+        self.frame = frame
+        self.cuboids = cuboids
+        self.index = index
+
+    @classmethod
+    def build(cls, frame, index=None, groupings=CUBOIDS):
+        cuboids = []
+        for dimensions in groupings:
+            # dropna=False keeps rows missing some dimension, so rollups over the others still count them
+            cuboid = frame.groupby(dimensions, observed=True, dropna=False)[MEASURE].sum().reset_index()
+            cuboids.append((frozenset(dimensions), cuboid))
+        # Smallest cuboids first so lookups pick the cheapest one that can answer
+        cuboids.sort(key=lambda item: len(item[1]))
+        return cls(frame, cuboids, index)
+
+    def cuboid_for(self, dimensions):
+        for cuboid_dimensions, cuboid in self.cuboids:
+            if dimensions <= cuboid_dimensions:
+                return cuboid
+        return self.frame
+
+    def _cuboid(self, column, filters):
+        active = {key: value for key, value in filters.items() if value is not None}
+        dimensions = set(active)
+        if column is not None:
+            dimensions.add(column)
+        return active, self.cuboid_for(dimensions)
+
+    def rows_to_read(self, column, filters=None):
+        # Rows an exact answer reads: the covering cuboid, or the matching raw rows when no cuboid covers the query
+        active, cuboid = self._cuboid(column, filters or {})
+        if cuboid is self.frame and active and self.index is not None:
+            return self.index.count(active)
+        return len(cuboid)
+
+    def _slice(self, column, filters):
+        active, cuboid = self._cuboid(column, filters)
+        if cuboid is self.frame and active and self.index is not None:
+            rows = self.index.rows(active)
+            scan.record(len(rows))
+            return cuboid.take(rows)
+        scan.record(len(cuboid))
+        if not active:
+            return cuboid
+        return cuboid[match(cuboid, active)]
+
+    def rollup(self, column, filters=None):
+        grouped = self._slice(column, filters or {}).groupby(column, observed=True)[MEASURE].sum()
+        grouped.index = grouped.index.astype(object)
+        return grouped
+
+    def total(self, filters=None):
+        return self._slice(None, filters or {})[MEASURE].sum()
+
+    def panels(self, requests):
+        # Rolls up every (column, filters) panel from one pass over the smallest cuboid that covers them all
+        if not requests:
+            return []
+        requests = [(column, {key: value for key, value in (filters or {}).items() if value is not None}) for column, filters in requests]
+        dimensions = set()
+        for column, filters in requests:
+            dimensions.add(column)
+            dimensions.update(filters)
+        cuboid = self.cuboid_for(dimensions)
+        measure = cuboid[MEASURE].to_numpy()
+        keys, weights, offsets = [], [], []
+        offset = 0
+        for column, filters in requests:
+            if not filters:
+                rows = slice(None)
+            elif cuboid is self.frame and self.index is not None:
+                rows = self.index.rows(filters)
+            else:
+                rows = match(cuboid, filters)
+            # As in _slice: an index lookup reads only the matching rows, anything else the whole cuboid
+            scan.record(len(cuboid) if not filters or rows.dtype == bool else len(rows))
+            codes = cuboid[column].cat.codes.to_numpy()[rows].astype(np.int64)
+            # Missing values (code -1) would otherwise land in the previous panel's bins
+            present = codes >= 0
+            keys.append(codes[present] + offset)
+            weights.append(measure[rows][present])
+            offsets.append(offset)
+            offset += len(cuboid[column].cat.categories)
+        # One weighted bincount over every panel's keys, each panel owning its own range of bins
+        keys = np.concatenate(keys)
+        sums = np.bincount(keys, weights=np.concatenate(weights), minlength=offset)
+        counts = np.bincount(keys, minlength=offset)
+        if np.issubdtype(measure.dtype, np.integer):
+            sums = np.rint(sums).astype(measure.dtype)
+        results = []
+        for (column, _), start in zip(requests, offsets):
+            categories = cuboid[column].cat.categories
+            present = counts[start:start + len(categories)] > 0
+            results.append(pd.Series(sums[start:start + len(categories)][present], index=pd.Index(categories[present], dtype=object, name=column), name=MEASURE))
+        return results
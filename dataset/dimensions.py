@@ -0,0 +1,73 @@
+import bisect
+import functools
+import re
+
+from dataset.schema import DIMENSIONS
+
+# Positions where a word starts, so 'king' finds 'United Kingdom'
+_WORD_START = re.compile(r'(?:^|(?<=[\s\-/(]))\S')
+
+
+class Dimensions:
+    def __init__(self, options, country_to_continent, continent_to_countries):
+        self.options = options
+        self.country_to_continent = country_to_continent
+        self.continent_to_countries = continent_to_countries
+
+    @classmethod
+    def build(cls, frame):
+        options = {column: sorted(frame[column].cat.categories) for column in DIMENSIONS}
+        # A country maps to the continent of its first record, as the tabs have always resolved it
+        pairs = frame[['Country', 'Continent']].dropna().drop_duplicates('Country')
+        country_to_continent = dict(zip(pairs['Country'].astype(object), pairs['Continent'].astype(object)))
+        continent_to_countries = {continent: [] for continent in options['Continent']}
+        for country in options['Country']:
+            # A country only ever recorded without a continent has none to cascade to
+            if country in country_to_continent:
+                continent_to_countries[country_to_continent[country]].append(country)
+        return cls(options, country_to_continent, continent_to_countries)
+
+    def continent_of(self, country):
+        return self.country_to_continent.get(country)
+
+    def countries_in(self, continent):
+        return self.continent_to_countries.get(continent, [])
+
+    def cascade_pairs(self, all_countries=None, all_continents=None):
+        # (country, continent) pairs the cascading dropdowns can reach: each country with the continent it moves
+        # to, then each continent, or none, picked with no country. all_countries and all_continents name the
+        # extra options of tabs that offer them; picking 'All Countries' clears the continent
+        pairs = [(country, self.continent_of(country)) for country in self.options['Country']]
+        if all_countries is not None:
+            pairs.append((all_countries, None))
+        continents = [None] + self.options['Continent'] + ([all_continents] if all_continents is not None else [])
+        return pairs + [(None, continent) for continent in continents]
+
+    def client_map(self):
+        # Compact form shipped to the browser for the clientside cascades
+        return {'countries': self.country_to_continent, 'continents': self.options['Continent']}
+
+    @functools.cached_property
+    def prefixes(self):
+        # Per column, every word start of every option, lowercased and sorted so a prefix lookup is a bisect
+        index = {}
+        for column, options in self.options.items():
+            entries = sorted(
+                (str(option).lower()[match.start():], position)
+                for position, option in enumerate(options)
+                for match in _WORD_START.finditer(str(option))
+            )
+            index[column] = ([key for key, _ in entries], [position for _, position in entries])
+        return index
+
+    def search(self, column, prefix, limit=20):
+        # Up to limit options with a word starting with prefix, in option order; cost grows with limit, not with the options
+        keys, positions = self.prefixes[column]
+        prefix = prefix.lower()
+        found = []
+        for at in range(bisect.bisect_left(keys, prefix), len(keys)):
+            if not keys[at].startswith(prefix) or len(found) == limit:
+                break
+            if positions[at] not in found:
+                found.append(positions[at])
+        return [self.options[column][position] for position in sorted(found)]
@@ -0,0 +1,71 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from dataset.schema import DIMENSIONS, MEASURE
+
+CHUNK_ROWS = 100000
+
+
+def _chunks(dataset, filters, group_by, chunk_rows):
+    # Grouped exports are bounded by the column's cardinality; row exports are read one slice of row ids at a time
+    if group_by is not None:
+        yield dataset.aggregate(group_by, filters)
+        return
+    rows = dataset.rows(filters)
+    total = len(dataset) if rows is None else len(rows)
+    columns = DIMENSIONS + [MEASURE]
+    for start in range(0, max(total, 1), chunk_rows):
+        if rows is None:
+            yield dataset.frame.iloc[start:start + chunk_rows][columns]
+        else:
+            yield dataset.frame.take(rows[start:start + chunk_rows])[columns]
+
+
+def iter_csv(dataset, filters, group_by=None, chunk_rows=CHUNK_ROWS):
+    for position, chunk in enumerate(_chunks(dataset, filters, group_by, chunk_rows)):
+        yield chunk.to_csv(index=False, header=position == 0)
+
+
+class _Sink:
+    # Write-only file object whose bytes the generator hands out after every row group
+    closed = False
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def writable(self):
+        return True
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def iter_parquet(dataset, filters, group_by=None, chunk_rows=CHUNK_ROWS):
+    sink = _Sink()
+    writer = None
+    for chunk in _chunks(dataset, filters, group_by, chunk_rows):
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema)
+        # Each chunk becomes one row group, so memory stays bounded by the chunk size
+        writer.write_table(table.cast(writer.schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
@@ -0,0 +1,172 @@
+import argparse
+import fcntl
+import hashlib
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1 << 16
+SHARD_SIZE = 8 << 20
+LOCK_FILE = 'spool.lock'
+
+
+def create_session(pool_size=8, retries=3, backoff=0.5):
+    session = requests.Session()
+    retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=(429, 500, 502, 503, 504), allowed_methods=('GET', 'HEAD'))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class Download:
+    def __init__(self, etag, chunks):
+        self.etag = etag
+        self._chunks = chunks
+
+    def chunks(self):
+        return self._chunks
+
+
+class Fetcher:
+    def __init__(self, url, spool_dir, workers=4, shard_size=SHARD_SIZE, timeout=(5, 60), attempts=3, backoff=0.5):
+        self.url = url
+        self.spool_dir = spool_dir
+        self.workers = workers
+        self.shard_size = shard_size
+        self.timeout = timeout
+        self.attempts = attempts
+        self.backoff = backoff
+        self.session = create_session(pool_size=max(workers, 1))
+
+    def fetch(self, etag=None):
+        # Returns None when the source still matches etag, otherwise a Download streaming the body in order
+        headers = {'If-None-Match': etag} if etag else {}
+        head = self.session.head(self.url, headers=headers, timeout=self.timeout, allow_redirects=True)
+        if head.status_code == 304:
+            return None
+        length = int(head.headers.get('Content-Length') or 0)
+        tag = head.headers.get('ETag', '')
+        # Only a strong ETag promises byte-identical ranges, which stitching shards together relies on
+        ranged = head.ok and head.headers.get('Accept-Ranges') == 'bytes' and tag and not tag.startswith('W/')
+        if ranged and self.workers > 1 and length > self.shard_size:
+            return Download(tag, self._sharded(tag, length))
+        response = self.session.get(self.url, headers=headers, stream=True, timeout=self.timeout)
+        if response.status_code == 304:
+            response.close()
+            return None
+        response.raise_for_status()
+        return Download(response.headers.get('ETag'), self._streamed(response))
+
+    def _streamed(self, response):
+        with response:
+            yield from response.iter_content(chunk_size=CHUNK_SIZE)
+
+    def _shard_dir(self, etag):
+        return os.path.join(self.spool_dir, hashlib.sha1(etag.encode()).hexdigest()[:16])
+
+    def _download_shard(self, etag, path, start, end):
+        # Returns the shard's path, or None when the server answered the range with anything but 206
+        if os.path.exists(path) and os.path.getsize(path) == end - start + 1:
+            # Finished by an earlier attempt against the same ETag
+            return path
+        for attempt in range(1, self.attempts + 1):
+            try:
+                # If-Range makes the server send the whole new body instead of a mismatched range if the data changed
+                headers = {'Range': f'bytes={start}-{end}', 'If-Range': etag}
+                with self.session.get(self.url, headers=headers, stream=True, timeout=self.timeout) as response:
+                    if response.status_code != 206:
+                        logger.warning('Shard %s came back with HTTP %d', path, response.status_code)
+                        return None
+                    partial = f'{path}.{os.getpid()}.partial'
+                    with open(partial, 'wb') as output:
+                        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                            output.write(chunk)
+                if os.path.getsize(partial) != end - start + 1:
+                    raise requests.exceptions.ContentDecodingError(f'Short shard {path}')
+                os.replace(partial, path)
+                return path
+            except requests.exceptions.RequestException:
+                if attempt == self.attempts:
+                    raise
+                logger.warning('Retrying shard %s (attempt %d)', path, attempt, exc_info=True)
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+
+    def _sharded(self, etag, length):
+        os.makedirs(self.spool_dir, exist_ok=True)
+        # Workers on the host share the spool, so one fetch at a time owns it. Shards are kept after a fetch:
+        # a worker that waited for the lock reads them back instead of downloading the same version again
+        with open(os.path.join(self.spool_dir, LOCK_FILE), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield from self._spooled(etag, length)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _spooled(self, etag, length):
+        directory = self._shard_dir(etag)
+        # Shards of any other version can never be resumed
+        for name in os.listdir(self.spool_dir):
+            path = os.path.join(self.spool_dir, name)
+            if path != directory and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+        ranges = [(start, min(start + self.shard_size, length) - 1) for start in range(0, length, self.shard_size)]
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='dataset-fetch') as pool:
+            futures = [pool.submit(self._download_shard, etag, os.path.join(directory, f'shard-{number:05d}'), start, end)
+                       for number, (start, end) in enumerate(ranges)]
+            # Hand shards to the parser in order while later ones are still downloading
+            position = 0
+            for future in futures:
+                path = future.result()
+                if path is None:
+                    for pending in futures:
+                        pending.cancel()
+                    yield from self._resumed(etag, position)
+                    break
+                with open(path, 'rb') as shard:
+                    for chunk in iter(lambda: shard.read(CHUNK_SIZE), b''):
+                        position += len(chunk)
+                        yield chunk
+
+    def _resumed(self, etag, position):
+        # Falls back to a single GET when a range request is refused, skipping the bytes the parser already has
+        response = self.session.get(self.url, stream=True, timeout=self.timeout)
+        response.raise_for_status()
+        if position and response.headers.get('ETag') != etag:
+            response.close()
+            raise RuntimeError('Dataset changed while fetching shards')
+        logger.warning('Falling back to a single download after %d bytes', position)
+        for chunk in self._streamed(response):
+            if position >= len(chunk):
+                position -= len(chunk)
+                continue
+            yield chunk[position:]
+            position = 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time a dataset download.')
+    parser.add_argument('url')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--shard-size', type=int, default=SHARD_SIZE)
+    parser.add_argument('--spool-dir', default='.dataset-cache/shards')
+    args = parser.parse_args()
+
+    fetcher = Fetcher(args.url, args.spool_dir, workers=args.workers, shard_size=args.shard_size)
+    started = time.perf_counter()
+    size = sum(len(chunk) for chunk in fetcher.fetch().chunks())
+    elapsed = time.perf_counter() - started
+    print(f'{size} bytes in {elapsed:.2f}s ({size / elapsed / 1e6:.1f} MB/s) with {args.workers} workers')
+
+
+if __name__ == '__main__':
+    main()
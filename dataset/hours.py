@@ -0,0 +1,122 @@
+import logging
+import re
+
+import numpy as np
+import pandas as pd
+
+from dataset.schema import MEASURE
+
+logger = logging.getLogger(__name__)
+
+COLUMN = 'Peak Usage Hours'
+HOURS = 24
+
+_START = re.compile(r'\s*(\d{1,2})(?::(\d{2}))?\s*(?:([AaPp])\.?[Mm]\b\.?)?')
+
+
+def parse_hour(label):
+    # Start hour of a bucket label such as '18:00-19:00', '7 PM-8 PM' or '7:30am', or None when it does not
+    # begin with one; a bare number could be anything, so it needs minutes or AM/PM
+    matched = _START.match(str(label))
+    if matched is None:
+        return None
+    hour, minutes, meridiem = matched.groups()
+    hour = int(hour)
+    if meridiem is not None:
+        if not 1 <= hour <= 12:
+            return None
+        return hour % 12 + (12 if meridiem in 'Pp' else 0)
+    if minutes is None or hour >= HOURS:
+        return None
+    return hour
+
+
+def hour_mask(hours):
+    # Hours in [start, end); a start past the end wraps around midnight, e.g. (22, 2)
+    if hours is None:
+        return np.ones(HOURS, dtype=bool)
+    start, end = hours
+    positions = np.arange(HOURS)
+    if start <= end:
+        return (positions >= start) & (positions < end)
+    return (positions >= start) | (positions < end)
+
+
+class HourIndex:
+    def __init__(self, sums, counts, countries, continents, labels):
+        # sums[country, continent, slot] totals the viewership of every record in that cell; counts tells empty from
+        # zero. Slots are the 24 hours followed by one per label without a start hour
+        self.sums = sums
+        self.counts = counts
+        self.countries = countries
+        self.continents = continents
+        self.labels = labels
+
+    @classmethod
+    def build(cls, frame):
+        # Labels are parsed once per distinct value, then every row lands in its cell through one bincount
+        categories = frame[COLUMN].cat.categories
+        parsed = [parse_hour(label) for label in categories]
+        unparsed = [label for label, hour in zip(categories, parsed) if hour is None]
+        if unparsed:
+            logger.warning('Peak usage hours without a start hour are charted after the hours, outside any hour range: %s', unparsed)
+        extra = iter(range(HOURS, HOURS + len(unparsed)))
+        category_slots = np.array([next(extra) if hour is None else hour for hour in parsed] + [-1], dtype=np.int64)
+        slots = HOURS + len(unparsed)
+
+        countries = frame['Country'].cat.categories
+        continents = frame['Continent'].cat.categories
+        # Rows without a country or continent get a trailing cell of their own, counted only when that axis is unfiltered
+        country_codes = frame['Country'].cat.codes.to_numpy().astype(np.int64)
+        country_codes[country_codes < 0] = len(countries)
+        continent_codes = frame['Continent'].cat.codes.to_numpy().astype(np.int64)
+        continent_codes[continent_codes < 0] = len(continents)
+        row_slots = category_slots[frame[COLUMN].cat.codes.to_numpy()]
+        valid = row_slots >= 0
+        cells = ((country_codes * (len(continents) + 1) + continent_codes) * slots + row_slots)[valid]
+
+        shape = (len(countries) + 1, len(continents) + 1, slots)
+        size = shape[0] * shape[1] * shape[2]
+        measure = frame[MEASURE].to_numpy()
+        sums = np.bincount(cells, weights=measure[valid], minlength=size).reshape(shape)
+        if np.issubdtype(measure.dtype, np.integer):
+            sums = np.rint(sums).astype(np.int64)
+        counts = np.bincount(cells, minlength=size).reshape(shape)
+
+        # Each hour keeps the label the data uses for it, unless several labels start at the same hour
+        labels = [f'{hour:02d}:00-{(hour + 1) % HOURS:02d}:00' for hour in range(HOURS)]
+        for hour in range(HOURS):
+            matching = [label for label, parsed_hour in zip(categories, parsed) if parsed_hour == hour]
+            if len(matching) == 1:
+                labels[hour] = matching[0]
+        return cls(sums, counts, countries, continents, labels + unparsed)
+
+    def _cells(self, filters):
+        selection = [slice(None), slice(None)]
+        for axis, (column, categories) in enumerate((('Country', self.countries), ('Continent', self.continents))):
+            value = (filters or {}).get(column)
+            if value is None:
+                continue
+            if value not in categories:
+                return None
+            selection[axis] = categories.get_loc(value)
+        return tuple(selection)
+
+    def histogram(self, filters=None, hours=None):
+        # Viewership per hour for a country and/or continent, restricted to an hour range; cost is independent of row count
+        slots = len(self.labels)
+        cells = self._cells(filters)
+        if cells is None:
+            sums = counts = np.zeros(slots, dtype=np.int64)
+        else:
+            sums = self.sums[cells].reshape(-1, slots).sum(axis=0)
+            counts = self.counts[cells].reshape(-1, slots).sum(axis=0)
+        if hours is None:
+            order = np.arange(slots)
+        else:
+            # A wrapped range reads from its start hour onwards, e.g. 22:00, 23:00, 00:00, 01:00
+            order = np.roll(np.arange(HOURS), -hours[0])
+            order = order[hour_mask(hours)[order]]
+        order = order[counts[order] > 0]
+        index = pd.Index([self.labels[hour] for hour in order], dtype=object, name=COLUMN)
+        return pd.Series(sums[order], index=index, name=MEASURE)
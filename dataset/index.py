@@ -0,0 +1,60 @@
+import numpy as np
+
+from dataset.schema import DIMENSIONS
+
+
+def _intersect(smaller, larger):
+    # Both inputs are sorted row ids; binary-search the smaller list into the larger one
+    positions = np.searchsorted(larger, smaller)
+    positions[positions == len(larger)] = 0
+    return smaller[larger[positions] == smaller] if len(larger) else smaller[:0]
+
+
+class RowIndex:
+    def __init__(self, orders, bounds, categories, size):
+        # orders holds each column's row ids grouped by value; bounds delimit each value's run within it
+        self.orders = orders
+        self.bounds = bounds
+        self.size = size
+        self.postings = {
+            column: {value: order[bounds[column][code]:bounds[column][code + 1]] for code, value in enumerate(categories[column])}
+            for column, order in orders.items()
+        }
+
+    @classmethod
+    def build(cls, frame, columns=DIMENSIONS):
+        dtype = np.int32 if len(frame) < np.iinfo(np.int32).max else np.int64
+        orders, bounds, categories = {}, {}, {}
+        for column in columns:
+            codes = frame[column].cat.codes.to_numpy()
+            categories[column] = frame[column].cat.categories
+            # A stable sort keeps row ids ascending within each value, so each posting list is a sorted slice;
+            # missing values (code -1) sort first and belong to no posting list
+            orders[column] = np.argsort(codes, kind='stable').astype(dtype)
+            missing = int((codes < 0).sum())
+            bounds[column] = missing + np.concatenate([[0], np.cumsum(np.bincount(codes[codes >= 0], minlength=len(categories[column])))])
+        return cls(orders, bounds, categories, len(frame))
+
+    def rows(self, filters):
+        # Returns the sorted row ids matching every filter, or None when nothing is filtered
+        lists = []
+        for column, value in filters.items():
+            if value is None:
+                continue
+            posting = self.postings[column].get(value)
+            if posting is None:
+                return np.empty(0, dtype=np.int64)
+            lists.append(posting)
+        if not lists:
+            return None
+        lists.sort(key=len)
+        rows = lists[0]
+        for posting in lists[1:]:
+            if not len(rows):
+                break
+            rows = _intersect(rows, posting)
+        return rows
+
+    def count(self, filters):
+        rows = self.rows(filters)
+        return self.size if rows is None else len(rows)
@@ -0,0 +1,119 @@
+import codecs
+import json
+
+import numpy as np
+import pandas as pd
+
+from dataset.schema import DIMENSIONS, MEASURE
+from dataset.store import Dataset
+from dataset.summary import SummaryStats
+
+BATCH_SIZE = 50000
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+
+def iter_records(chunks):
+    # Incrementally parse a top-level JSON array of objects from an iterable of byte chunks
+    text = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    started = finished = False
+    for chunk in chunks:
+        buffer += text.decode(chunk)
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            if position == len(buffer) or finished:
+                break
+            char = buffer[position]
+            if not started:
+                if char != '[':
+                    raise ValueError('Expected the dataset to be a JSON array')
+                started = True
+                position += 1
+            elif char == ',':
+                position += 1
+            elif char == ']':
+                finished = True
+                position += 1
+            else:
+                try:
+                    # Elements are objects, so a truncated one never decodes until its closing brace arrives
+                    record, position = _decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    break
+                yield record
+        buffer = buffer[position:]
+    if not finished or buffer.strip():
+        raise ValueError('Dataset JSON ended unexpectedly')
+
+
+def check_records(records):
+    # Validates records posted to /ingest, raising ValueError with a message meant for the client
+    if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+        raise ValueError('Expected a JSON array of records')
+    if not records:
+        raise ValueError('Expected at least one record')
+    columns = DIMENSIONS + [MEASURE]
+    missing = sorted({column for record in records for column in columns if column not in record})
+    if missing:
+        raise ValueError(f'Records are missing {", ".join(missing)}')
+    empty = sorted({column for record in records for column in columns if record[column] is None})
+    if empty:
+        raise ValueError(f'Records have null {", ".join(empty)}')
+
+
+def iter_batches(records, size=BATCH_SIZE):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class DatasetBuilder:
+    def __init__(self):
+        self.categories = {column: {} for column in DIMENSIONS}
+        self.codes = {column: [] for column in DIMENSIONS}
+        self.measures = []
+        self.summary = None
+
+    def append(self, records):
+        values = {}
+        for column in DIMENSIONS:
+            values[column] = pd.Series([record[column] for record in records], dtype=object)
+            batch_codes, uniques = pd.factorize(values[column])
+            lookup = self.categories[column]
+            # Translate batch-local codes into codes shared across every batch; nulls keep -1, pandas' missing code.
+            # Labels are strings, as in Dataset.from_frame, so records appended later always match the snapshot
+            mapping = np.fromiter((lookup.setdefault(str(value), len(lookup)) for value in uniques), dtype=np.int32, count=len(uniques))
+            self.codes[column].append(np.where(batch_codes < 0, -1, mapping[batch_codes]).astype(np.int32))
+        self.measures.append(pd.to_numeric(pd.Series([record[MEASURE] for record in records])).to_numpy())
+        # Summary statistics accumulate batch by batch instead of being recomputed over the finished frame
+        batch = SummaryStats.from_frame(pd.DataFrame({'Continent': values['Continent'], 'Sport': values['Sport'], MEASURE: self.measures[-1]}))
+        self.summary = batch if self.summary is None else self.summary.merge(batch)
+
+    def build(self, etag=None):
+        columns = {}
+        for column in DIMENSIONS:
+            values = list(self.categories[column])
+            codes = np.concatenate(self.codes[column]) if self.codes[column] else np.empty(0, dtype=np.int32)
+            # Re-rank codes so categories come out sorted, matching Dataset.from_frame
+            order = sorted(range(len(values)), key=values.__getitem__)
+            rank = np.empty(len(values), dtype=np.int32)
+            rank[order] = np.arange(len(values), dtype=np.int32)
+            columns[column] = pd.Categorical.from_codes(np.where(codes < 0, -1, rank[codes]), [values[code] for code in order])
+        columns[MEASURE] = np.concatenate(self.measures) if self.measures else np.empty(0, dtype=np.int64)
+        return Dataset(pd.DataFrame(columns), etag=etag, summary=self.summary)
+
+
+def read_dataset(chunks, batch_size=BATCH_SIZE, etag=None):
+    builder = DatasetBuilder()
+    for batch in iter_batches(iter_records(chunks), batch_size):
+        builder.append(batch)
+    return builder.build(etag=etag)
@@ -0,0 +1,26 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class Refresher(threading.Thread):
+    def __init__(self, source, interval=None):
+        super().__init__(name='dataset-refresher', daemon=True)
+        self.source = source
+        self.interval = interval or None
+        self._wake = threading.Event()
+
+    def trigger(self):
+        self._wake.set()
+
+    def run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                dataset = self.source.refresh()
+                logger.info('Refreshed dataset to version %s (%d rows) in %.2fs', dataset.version, len(dataset), self.source.last_refresh_seconds)
+            except Exception:
+                # Keep serving the previous snapshot and retry on the next tick
+                logger.exception('Dataset refresh failed')
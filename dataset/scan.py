@@ -0,0 +1,21 @@
+import contextvars
+from contextlib import contextmanager
+
+# Rows read by queries in the current context, when something is counting
+_counter = contextvars.ContextVar('rows_scanned', default=None)
+
+
+def record(rows):
+    counter = _counter.get()
+    if counter is not None:
+        counter[0] += rows
+
+
+@contextmanager
+def counting():
+    counter = [0]
+    token = _counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _counter.reset(token)
@@ -0,0 +1,17 @@
+import numpy as np
+
+DIMENSIONS = ['Country', 'Continent', 'Sport', 'Age', 'Gender', 'Referrer', 'User Agents', 'Peak Usage Hours']
+MEASURE = 'Viewership'
+
+
+def match(frame, filters):
+    # Compare categorical codes rather than strings; a value missing from the categories matches nothing
+    mask = np.ones(len(frame), dtype=bool)
+    for column, value in filters.items():
+        if value is None:
+            continue
+        categories = frame[column].cat.categories
+        if value not in categories:
+            return np.zeros(len(frame), dtype=bool)
+        mask &= frame[column].cat.codes.to_numpy() == categories.get_loc(value)
+    return mask
@@ -0,0 +1,123 @@
+import logging
+import os
+import pickle
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from dataset.cube import Cube
+from dataset.index import RowIndex
+from dataset.schema import DIMENSIONS, MEASURE
+from dataset.store import Dataset
+
+logger = logging.getLogger(__name__)
+
+CURRENT = 'CURRENT'
+META_FILE = 'meta.pickle'
+
+
+def _array_path(directory, kind, position):
+    return os.path.join(directory, f'{kind}-{position}.npy')
+
+
+def current_path(directory):
+    try:
+        with open(os.path.join(directory, CURRENT)) as current:
+            return os.path.join(directory, current.read().strip())
+    except FileNotFoundError:
+        return None
+
+
+def export(dataset, directory):
+    # Writes every large array as its own .npy file so other processes can map the pages instead of copying them
+    name = f'{time.time_ns()}-{os.getpid()}'
+    target = os.path.join(directory, name)
+    staging = f'{target}.partial'
+    os.makedirs(staging)
+    frame = dataset.frame
+    for position, column in enumerate(DIMENSIONS):
+        np.save(_array_path(staging, 'codes', position), frame[column].cat.codes.to_numpy())
+        np.save(_array_path(staging, 'order', position), dataset.index.orders[column])
+        np.save(_array_path(staging, 'bounds', position), dataset.index.bounds[column])
+    np.save(_array_path(staging, 'measure', 0), frame[MEASURE].to_numpy())
+    # Everything else is small enough for each process to hold privately
+    meta = {
+        'categories': {column: list(frame[column].cat.categories) for column in DIMENSIONS},
+        'etag': dataset.etag,
+        'fingerprint': dataset.fingerprint,
+        'cuboids': dataset.cube.cuboids,
+        'dimensions': dataset.dimensions,
+        'hours': dataset.hours,
+        'sample': dataset.sample,
+        'summary': dataset.summary,
+    }
+    with open(os.path.join(staging, META_FILE), 'wb') as output:
+        pickle.dump(meta, output, protocol=pickle.HIGHEST_PROTOCOL)
+    os.rename(staging, target)
+
+    partial = os.path.join(directory, f'{CURRENT}.{os.getpid()}.partial')
+    with open(partial, 'w') as current:
+        current.write(name)
+    os.replace(partial, os.path.join(directory, CURRENT))
+    # Processes still mapping older exports keep their pages after the files are unlinked
+    for entry in os.listdir(directory):
+        path = os.path.join(directory, entry)
+        if entry != name and os.path.isdir(path) and not entry.endswith('.partial'):
+            shutil.rmtree(path, ignore_errors=True)
+    return target
+
+
+def attach(path):
+    with open(os.path.join(path, META_FILE), 'rb') as source:
+        meta = pickle.load(source)
+    columns, orders, bounds = {}, {}, {}
+    for position, column in enumerate(DIMENSIONS):
+        codes = np.load(_array_path(path, 'codes', position), mmap_mode='r')
+        columns[column] = pd.Categorical.from_codes(codes, meta['categories'][column])
+        orders[column] = np.load(_array_path(path, 'order', position), mmap_mode='r')
+        bounds[column] = np.load(_array_path(path, 'bounds', position))
+    columns[MEASURE] = np.load(_array_path(path, 'measure', 0), mmap_mode='r')
+    frame = pd.DataFrame(columns, copy=False)
+
+    index = RowIndex(orders, bounds, meta['categories'], len(frame))
+    dataset = Dataset(
+        frame,
+        etag=meta['etag'],
+        summary=meta['summary'],
+        index=index,
+        cube=Cube(frame, meta['cuboids'], index),
+        dimensions=meta['dimensions'],
+        hours=meta.get('hours'),
+        sample=meta.get('sample'),
+    )
+    dataset.fingerprint = meta['fingerprint']
+    dataset.shared_path = path
+    return dataset
+
+
+def share(dataset, directory):
+    return attach(export(dataset, directory))
+
+
+class Watcher(threading.Thread):
+    # Publishes exports written by any other process sharing the directory
+    def __init__(self, source, directory, interval=1.0):
+        super().__init__(name='dataset-watcher', daemon=True)
+        self.source = source
+        self.directory = directory
+        self.interval = interval
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            path = current_path(self.directory)
+            if path is None or path == getattr(self.source.current(), 'shared_path', None):
+                continue
+            try:
+                self.source.publish(attach(path))
+            except OSError:
+                # Superseded and removed by a newer export before it could be mapped; the next tick picks that up
+                logger.warning('Could not attach shared dataset %s', path, exc_info=True)
@@ -0,0 +1,58 @@
+import json
+import logging
+import os
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from dataset.store import Dataset
+
+DATA_FILE = 'dataset.arrow'
+META_FILE = 'dataset.json'
+
+logger = logging.getLogger(__name__)
+
+
+def _replace(path, write):
+    # Write beside the target and rename so readers never see a partial file; the pid keeps workers saving
+    # at the same moment from writing into each other's temporary file
+    partial = f'{path}.{os.getpid()}.partial'
+    try:
+        write(partial)
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+
+
+def save(dataset, directory):
+    os.makedirs(directory, exist_ok=True)
+    # Uncompressed Arrow IPC keeps the file memory-mappable; categoricals are stored as dictionary arrays
+    _replace(os.path.join(directory, DATA_FILE), lambda path: feather.write_feather(dataset.frame, path, compression='uncompressed'))
+
+    def write_meta(path):
+        with open(path, 'w') as meta:
+            json.dump({'etag': dataset.etag, 'fingerprint': dataset.fingerprint, 'rows': len(dataset)}, meta)
+    _replace(os.path.join(directory, META_FILE), write_meta)
+
+
+def load(directory):
+    data_path = os.path.join(directory, DATA_FILE)
+    meta_path = os.path.join(directory, META_FILE)
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None
+    try:
+        with open(meta_path) as meta:
+            meta = json.load(meta)
+        frame = feather.read_table(data_path, memory_map=True).to_pandas()
+        if len(frame) != meta.get('rows'):
+            raise ValueError(f"snapshot has {len(frame)} rows, its metadata says {meta.get('rows')}")
+    except (OSError, ValueError, pa.ArrowException):
+        # A snapshot that cannot be read is ignored; the boot falls back to a fresh fetch
+        logger.warning('Ignoring unreadable snapshot in %s', directory, exc_info=True)
+        return None
+    dataset = Dataset(frame, etag=meta.get('etag'))
+    if meta.get('fingerprint'):
+        # Snapshots extended through /ingest keep the source etag but not its fingerprint
+        dataset.fingerprint = meta['fingerprint']
+    return dataset
@@ -0,0 +1,65 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class DataSource:
+    def __init__(self, load, prepare=None):
+        self._load = load
+        # prepare turns a freshly built snapshot into the one published, e.g. a shared-memory copy of it
+        self._prepare = prepare or (lambda dataset: dataset)
+        self._dataset = None
+        self._lock = threading.Lock()
+        # A fork taken mid-refresh must not leave the child with a lock nobody will release
+        os.register_at_fork(after_in_child=self._reset_lock)
+        self.version = 0
+        self.last_refresh_seconds = None
+        self._listeners = []
+
+    def _reset_lock(self):
+        self._lock = threading.Lock()
+
+    def current(self):
+        # Callbacks read the snapshot once and use it throughout, so a concurrent swap never mixes versions
+        return self._dataset
+
+    def subscribe(self, listener):
+        # Listeners run on the publishing thread after each swap, e.g. to prebuild per-version results
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+
+    def publish(self, dataset):
+        dataset.version = self.version + 1
+        # Publishing is a single reference assignment, after the snapshot is fully built
+        self._dataset = dataset
+        self.version = dataset.version
+        for listener in self._listeners:
+            try:
+                listener(dataset)
+            except Exception:
+                logger.exception('Snapshot listener failed for version %s', dataset.version)
+
+    def refresh(self):
+        with self._lock:
+            started = time.perf_counter()
+            # The loader gets the current snapshot so it can revalidate it and hand it back unchanged
+            dataset = self._load(self._dataset)
+            if dataset is not self._dataset:
+                dataset = self._prepare(dataset)
+                self.publish(dataset)
+            self.last_refresh_seconds = time.perf_counter() - started
+            return dataset
+
+    def append(self, dataset):
+        # Incremental refresh: publish the current snapshot extended with newly arrived rows
+        with self._lock:
+            started = time.perf_counter()
+            extended = self._prepare(self._dataset.extend(dataset))
+            self.publish(extended)
+            self.last_refresh_seconds = time.perf_counter() - started
+            return extended
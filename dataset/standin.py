@@ -0,0 +1,38 @@
+import argparse
+import os
+import tempfile
+
+from flask import Flask, send_file
+
+from dataset.synthetic import write_json
+
+
+def create_app(path):
+    server = Flask(__name__)
+
+    @server.route('/')
+    def dataset():
+        # send_file answers If-None-Match with 304 and honours Range requests
+        return send_file(path, mimetype='application/json', conditional=True, etag=True, max_age=0)
+
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a local stand-in for the dataset endpoint.')
+    parser.add_argument('path', nargs='?', help='JSON file to serve; a synthetic one is generated when omitted')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--port', type=int, default=8051)
+    args = parser.parse_args()
+
+    path = args.path
+    if path is None:
+        path = os.path.join(tempfile.gettempdir(), f'dataset-{args.rows}-{args.seed}.json')
+        if not os.path.exists(path):
+            write_json(path, args.rows, args.seed)
+    create_app(os.path.abspath(path)).run(port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+import functools
+import hashlib
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from dataset import approx
+from dataset.cube import Cube
+from dataset.dimensions import Dimensions
+from dataset.hours import HourIndex
+from dataset.index import RowIndex
+from dataset.schema import DIMENSIONS, MEASURE
+from dataset.summary import SummaryStats
+
+
+class Dataset:
+    def __init__(self, frame, version=None, etag=None, summary=None, index=None, cube=None, dimensions=None, hours=None, sample=None):
+        # Derived structures are built here unless handed over prebuilt, e.g. when attaching a shared export
+        self.frame = frame
+        self.version = version
+        self.etag = etag
+        self.index = index if index is not None else RowIndex.build(frame)
+        self.cube = cube if cube is not None else Cube.build(frame, self.index)
+        self.dimensions = dimensions if dimensions is not None else Dimensions.build(frame)
+        self.hours = hours if hours is not None else HourIndex.build(frame)
+        # Approximate mode keeps a stratified sample for queries too large to answer exactly at interactive speed
+        if sample is None and approx.settings.enabled:
+            sample = approx.StratifiedSample.build(frame, self.index, approx.settings.rate, approx.settings.minimum, approx.settings.seed)
+        self.sample = sample
+        self.summary = summary if summary is not None else SummaryStats.from_frame(frame)
+
+    @classmethod
+    def from_records(cls, records, etag=None):
+        frame = pd.DataFrame.from_records(records, columns=DIMENSIONS + [MEASURE])
+        return cls.from_frame(frame, etag=etag)
+
+    @classmethod
+    def from_frame(cls, frame, etag=None):
+        # Dictionary-encode every dimension so filters compare small integer codes; labels are strings whatever
+        # the JSON type, so e.g. an Age sent as 30 extends the same categories as '30'
+        columns = {column: frame[column].map(str, na_action='ignore').astype('category') for column in DIMENSIONS}
+        columns[MEASURE] = pd.to_numeric(frame[MEASURE])
+        return cls(pd.DataFrame(columns), etag=etag)
+
+    def extend(self, other):
+        # New snapshot with other's rows appended; summary statistics are merged rather than recomputed
+        columns = {column: union_categoricals([self.frame[column], other.frame[column]], sort_categories=True) for column in DIMENSIONS}
+        columns[MEASURE] = pd.concat([self.frame[MEASURE], other.frame[MEASURE]], ignore_index=True)
+        # The etag still names the fetched data, so revalidation keeps answering 304 and the appended rows survive
+        # refreshes until the source itself changes; the fingerprint has to change with the rows, though
+        extended = Dataset(pd.DataFrame(columns), etag=self.etag, summary=self.summary.merge(other.summary))
+        extended.fingerprint = hashlib.sha1(f'{self.fingerprint}+{other.fingerprint}'.encode()).hexdigest()
+        return extended
+
+    @functools.cached_property
+    def fingerprint(self):
+        # Identical across processes for the same data, unlike the per-process version counter
+        if self.etag:
+            return self.etag
+        hashed = pd.util.hash_pandas_object(self.frame, index=False).to_numpy()
+        return hashlib.sha1(hashed.tobytes()).hexdigest()
+
+    def __len__(self):
+        return len(self.frame)
+
+    def values(self, column):
+        return self.dimensions.options[column]
+
+    def rows(self, filters):
+        return self.index.rows(filters)
+
+    def viewership_by(self, column, filters=None):
+        return self.cube.rollup(column, filters)
+
+    def aggregate(self, column, filters=None):
+        # Grouped rows for charts, one per distinct value of column rather than one per record
+        return self.viewership_by(column, filters).rename_axis(column).reset_index()
+
+    def panels(self, requests):
+        # Several (column, filters) rollups computed together, e.g. a tab's country and continent charts
+        return self.cube.panels(requests)
+
+    def _approximate(self, column, filters):
+        # The sample answers only queries whose exact answer reads more rows than approximate mode allows and
+        # more than the sample itself, which an estimate reads in full
+        if self.sample is None:
+            return False
+        exact = self.cube.rows_to_read(column, filters)
+        return exact > approx.settings.max_exact_rows and exact > len(self.sample.frame)
+
+    def estimate(self, column, filters=None):
+        # (values, errors): exact with no errors unless the sample is both allowed and cheaper
+        if not self._approximate(column, filters):
+            return self.viewership_by(column, filters), None
+        return self.sample.estimate(column, filters)
+
+    def estimate_panels(self, requests):
+        # Panels as (values, errors) pairs, computed in one pass whenever every one of them is answered exactly
+        if not any(self._approximate(column, filters) for column, filters in requests):
+            return [(values, None) for values in self.panels(requests)]
+        return [self.estimate(column, filters) for column, filters in requests]
+
+    def hour_histogram(self, filters=None, hours=None):
+        return self.hours.histogram(filters, hours)
+
+    def total(self, filters=None):
+        return self.cube.total(filters)
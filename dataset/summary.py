@@ -0,0 +1,52 @@
+import pandas as pd
+
+from dataset.schema import MEASURE
+
+
+def _merge_totals(left, right):
+    merged = pd.concat([left, right]).groupby(level=0).sum()
+    merged.index = merged.index.astype(object)
+    return merged
+
+
+class SummaryStats:
+    # Running aggregates behind the summary tab; two instances merge without revisiting any rows
+    def __init__(self, rows, total, maximum, minimum, by_continent, by_sport):
+        self.rows = rows
+        self.total = total
+        self.maximum = maximum
+        self.minimum = minimum
+        self.by_continent = by_continent
+        self.by_sport = by_sport
+
+    @classmethod
+    def from_frame(cls, frame):
+        values = frame[MEASURE]
+        totals = {}
+        for column in ('Continent', 'Sport'):
+            totals[column] = frame.groupby(column, observed=True)[MEASURE].sum()
+            totals[column].index = totals[column].index.astype(object)
+        return cls(
+            rows=len(frame),
+            total=values.sum(),
+            maximum=values.max() if len(frame) else None,
+            minimum=values.min() if len(frame) else None,
+            by_continent=totals['Continent'],
+            by_sport=totals['Sport'],
+        )
+
+    def merge(self, other):
+        extremes = [value for value in (self.maximum, other.maximum) if value is not None]
+        lows = [value for value in (self.minimum, other.minimum) if value is not None]
+        return SummaryStats(
+            rows=self.rows + other.rows,
+            total=self.total + other.total,
+            maximum=max(extremes) if extremes else None,
+            minimum=min(lows) if lows else None,
+            by_continent=_merge_totals(self.by_continent, other.by_continent),
+            by_sport=_merge_totals(self.by_sport, other.by_sport),
+        )
+
+    @property
+    def average(self):
+        return self.total / self.rows
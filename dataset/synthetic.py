@@ -0,0 +1,46 @@
+import json
+import random
+
+COUNTRIES = {
+    'Kenya': 'Africa', 'Nigeria': 'Africa', 'Egypt': 'Africa', 'South Africa': 'Africa', 'Morocco': 'Africa',
+    'China': 'Asia', 'India': 'Asia', 'Japan': 'Asia', 'South Korea': 'Asia', 'Indonesia': 'Asia',
+    'France': 'Europe', 'Germany': 'Europe', 'Italy': 'Europe', 'Spain': 'Europe', 'United Kingdom': 'Europe',
+    'United States': 'North America', 'Canada': 'North America', 'Mexico': 'North America', 'Jamaica': 'North America',
+    'Brazil': 'South America', 'Argentina': 'South America', 'Colombia': 'South America', 'Chile': 'South America',
+    'Australia': 'Oceania', 'New Zealand': 'Oceania', 'Fiji': 'Oceania',
+}
+SPORTS = ['Athletics', 'Swimming', 'Football', 'Basketball', 'Tennis', 'Cycling', 'Rowing', 'Boxing', 'Gymnastics', 'Volleyball']
+AGE_GROUPS = ['18-25', '26-35', '36-45', '46-55', '56-65', '66-70']
+GENDERS = ['Male', 'Female']
+REFERRERS = ['Google', 'Facebook', 'Twitter', 'Instagram', 'YouTube', 'Direct']
+USER_AGENTS = ['Mobile', 'Desktop', 'Tablet', 'Smart TV']
+PEAK_USAGE_HOURS = [f'{hour:02d}:00-{(hour + 1) % 24:02d}:00' for hour in range(24)]
+
+
+def generate(rows, seed=0):
+    rng = random.Random(seed)
+    countries = list(COUNTRIES)
+    for _ in range(rows):
+        country = rng.choice(countries)
+        yield {
+            'Country': country,
+            'Continent': COUNTRIES[country],
+            'Sport': rng.choice(SPORTS),
+            'Age': rng.choice(AGE_GROUPS),
+            'Gender': rng.choice(GENDERS),
+            'Referrer': rng.choice(REFERRERS),
+            'User Agents': rng.choice(USER_AGENTS),
+            'Peak Usage Hours': rng.choice(PEAK_USAGE_HOURS),
+            'Viewership': rng.randint(100, 100000),
+        }
+
+
+def write_json(path, rows, seed=0):
+    # Stream records to disk one at a time so large exports never sit in memory
+    with open(path, 'w') as output:
+        output.write('[')
+        for position, record in enumerate(generate(rows, seed)):
+            if position:
+                output.write(',')
+            json.dump(record, output)
+        output.write(']')
@@ -0,0 +1,29 @@
+import heapq
+
+import numpy as np
+import pandas as pd
+
+OTHER = 'Other'
+
+
+def top_n(values, limit, errors=None, other=True):
+    # Keeps the limit - 1 largest values in their original order and folds the tail into a single 'Other' entry;
+    # without other, the limit largest values are kept and the tail is dropped
+    if limit is None or len(values) <= limit:
+        return values, errors
+    sums = values.to_numpy()
+    keep = np.zeros(len(sums), dtype=bool)
+    keep[heapq.nlargest(max(limit - 1, 0) if other else limit, range(len(sums)), key=sums.__getitem__)] = True
+    if not other:
+        return values[keep], None if errors is None else errors[keep]
+
+    tail = pd.Series([sums[~keep].sum()], index=[OTHER], dtype=values.dtype)
+    folded = pd.concat([values[keep], tail]).groupby(level=0, sort=False).sum()
+    folded.index = folded.index.astype(object).rename(values.index.name)
+    folded.name = values.name
+    if errors is None:
+        return folded, None
+    # Tail errors are combined as if independent
+    squared = pd.concat([errors[keep] ** 2, pd.Series([(errors.to_numpy()[~keep] ** 2).sum()], index=[OTHER])])
+    folded_errors = np.sqrt(squared.groupby(level=0, sort=False).sum()).reindex(folded.index)
+    return folded, folded_errors
@@ -0,0 +1,16 @@
+import gc
+import os
+
+# In shared-memory mode the master loads the dataset once and every worker maps the same exported pages
+preload_app = bool(os.environ.get('DATASET_SHARED_DIR'))
+
+
+def pre_fork(server, worker):
+    # Objects inherited from the master are never collected in workers, so the collector never writes to their pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        import app
+        app.start_worker_threads()
@@ -0,0 +1,13 @@
+import pandas as pd
+
+
+def approximate_note(values, errors):
+    # Title suffix for estimated figures, with the largest relative half-width of their 95% intervals
+    if errors is None:
+        return ''
+    relative = (errors / values.where(values != 0)).max()
+    return f' (approximate, ±{relative:.1%})' if pd.notna(relative) else ' (approximate)'
+
+
+def error_bars(errors):
+    return None if errors is None else list(errors)
@@ -0,0 +1,218 @@
+import fcntl
+import functools
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from tabs.metrics import note_cache, note_figure
+
+
+LOCK_STRIPES = 64
+
+
+class MemoryCache:
+    def __init__(self, max_entries=256, max_bytes=64 << 20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, value, size):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            # Evict least recently used entries until both bounds hold
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+
+class DiskCache:
+    # Pickled entries in a directory shared by every gunicorn worker on the host
+    def __init__(self, directory, max_bytes=512 << 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        # Bytes on disk as of the last scan plus what this process wrote since; other workers' writes show up at the next scan
+        self._bytes = None
+
+    def _path(self, key, suffix=''):
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + suffix)
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as entry:
+                payload = entry.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(self._path(key))
+        except FileNotFoundError:
+            # Pruned by another worker after it was read, which does not undo the hit
+            pass
+        return pickle.loads(payload), len(payload)
+
+    def set(self, key, payload):
+        path = self._path(key)
+        partial = f'{path}.{os.getpid()}.partial'
+        with open(partial, 'wb') as entry:
+            entry.write(payload)
+        os.replace(partial, path)
+        if self._bytes is not None:
+            self._bytes += len(payload)
+        if self._bytes is None or self._bytes > self.max_bytes:
+            self._prune()
+
+    @contextmanager
+    def lock(self, key):
+        # Serializes computation of one key across processes. Keys share a fixed set of striped lock files, which
+        # are never removed so they stay valid and never grow with the number of keys
+        stripe = int(hashlib.sha1(key.encode()).hexdigest(), 16) % LOCK_STRIPES
+        with open(os.path.join(self.directory, f'stripe-{stripe:02d}.lock'), 'a') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _prune(self):
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(('.lock', '.partial')):
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+        # Drop the least recently used files, using mtime as the access clock, down to 90% of the budget so
+        # the next scan is not due again after a single write
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._bytes = total
+
+
+class FigureCache:
+    def __init__(self):
+        self.memory = MemoryCache()
+        self.disk = None
+        self.hits = 0
+        self.misses = 0
+        self.warmable = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._reset_inflight)
+
+    def _reset_inflight(self):
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def configure(self, max_entries=256, max_bytes=64 << 20, directory=None, disk_max_bytes=512 << 20):
+        self.memory = MemoryCache(max_entries, max_bytes)
+        self.disk = DiskCache(directory, disk_max_bytes) if directory else None
+
+    def _lookup(self, key):
+        entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                self.memory.set(key, *entry)
+        return None if entry is None else entry[0]
+
+    def get_or_compute(self, key, compute):
+        value = self._lookup(key)
+        if value is not None:
+            self._hit()
+            return value
+        # Single flight: concurrent requests for the same key wait for the first one to finish
+        with self._lock:
+            flight = self._inflight.get(key)
+            owner = flight is None
+            if owner:
+                flight = self._inflight[key] = threading.Event()
+        if not owner:
+            flight.wait()
+            value = self._lookup(key)
+            if value is not None:
+                self._hit()
+                return value
+        try:
+            if self.disk is None:
+                return self._compute(key, compute)
+            with self.disk.lock(key):
+                # Another worker may have stored it while this one waited for the lock
+                value = self._lookup(key)
+                if value is not None:
+                    self._hit()
+                    return value
+                return self._compute(key, compute)
+        finally:
+            if owner:
+                with self._lock:
+                    del self._inflight[key]
+                flight.set()
+
+    def _hit(self):
+        self.hits += 1
+        note_cache(True)
+
+    def _compute(self, key, compute):
+        self.misses += 1
+        note_cache(False)
+        started = time.perf_counter()
+        value = compute()
+        note_figure(time.perf_counter() - started)
+        self.store(key, value, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        return value
+
+    def store(self, key, value, payload):
+        self.memory.set(key, value, len(payload))
+        if self.disk is not None:
+            self.disk.set(key, payload)
+
+    def contains(self, key):
+        return self._lookup(key) is not None
+
+    @staticmethod
+    def key(name, fingerprint, args):
+        # Keys combine the callback, its inputs and the dataset fingerprint, so a refresh invalidates everything
+        return json.dumps([name, fingerprint, list(args)], default=str)
+
+    def memoize(self, source, inputs=None):
+        # inputs(dataset) enumerates the argument tuples the pre-warmer computes ahead of the first request
+        def decorator(function):
+            name = f'{function.__module__}.{function.__qualname__}'
+            if inputs is not None:
+                self.warmable[name] = (function, inputs, source)
+
+            @functools.wraps(function)
+            def wrapper(*args):
+                key = self.key(name, source.current().fingerprint, args)
+                return self.get_or_compute(key, lambda: function(*args))
+            return wrapper
+        return decorator
+
+
+figure_cache = FigureCache()
@@ -1,9 +1,10 @@
-from dash import dcc, html, Input, Output
-import plotly.express as px
+from dash import dcc, html, ClientsideFunction, Input, Output, State
+from tabs.cache import figure_cache
+from tabs.search import dropdown_options, register_search, search_store
+
+def register_callbacks(app, source):
+    register_search(app, source, 'country-demographic-dropdown', 'Country')
 
-def layout(app, data):
-    countries = sorted(set(record['Country'] for record in data))
-    continents = sorted(set(record['Continent'] for record in data))
     age_groups = {
         "18-25": "18-25",
         "26-35": "26-35",
@@ -13,19 +14,17 @@ def layout(app, data):
         "66-70": "66-70"
     }
 
-    @app.callback(
+    # The continent follows the country in the browser, from the map shipped with the page
+    app.clientside_callback(
+        ClientsideFunction(namespace='cascade', function_name='continentOf'),
         Output('continent-demographic-dropdown', 'value'),
         [Input('country-demographic-dropdown', 'value')],
+        [State('country-continent-map', 'data')],
         prevent_initial_call=True
     )
-    def update_continent_based_on_country(selected_country):
-        if selected_country is None:
-            return None
-        
-        for record in data:
-            if record['Country'] == selected_country:
-                return record['Continent']
-        return None
+
+    def demographic_inputs(data):
+        return [(demographic,) + pair for demographic in ('Age', 'Gender') for pair in data.dimensions.cascade_pairs()]
 
     @app.callback(
         [Output('country-demographic-output', 'children'),
@@ -34,43 +33,44 @@ def layout(app, data):
          Input('country-demographic-dropdown', 'value'),
          Input('continent-demographic-dropdown', 'value')]
     )
+    @figure_cache.memoize(source, inputs=demographic_inputs)
     def update_demographic_output(selected_demographic, selected_country, selected_continent):
-        filtered_data_country = data.copy()
-        filtered_data_continent = data.copy()
-        
-        # Apply country filter
-        if selected_country:
-            filtered_data_country = [record for record in filtered_data_country if record['Country'] == selected_country]
-        
-        # Apply continent filter
-        if selected_continent:
-            filtered_data_continent = [record for record in filtered_data_continent if record['Continent'] == selected_continent]
-        
+        import plotly.express as px
+
+        data = source.current()
+        # Apply country and continent filters
+        country_filters = {'Country': selected_country or None}
+        continent_filters = {'Continent': selected_continent or None}
+
         if selected_demographic == 'Age':
             # Group ages and sum viewership
-            age_group_counts_country = {age_group: sum(record['Viewership'] for record in filtered_data_country if age_group == record['Age']) for age_group in age_groups.values()}
-            age_group_counts_sorted_country = {k: age_group_counts_country[k] for k in sorted(age_group_counts_country.keys())}
-            age_fig_country = px.bar(x=list(age_group_counts_sorted_country.keys()), y=list(age_group_counts_sorted_country.values()), title=f'Viewership Distribution by Age Group (Country) - {selected_country}')
+            age_group_counts_country, age_group_counts_continent = data.panels([('Age', country_filters), ('Age', continent_filters)])
+            age_group_counts_country = age_group_counts_country.reindex(sorted(age_groups.values()), fill_value=0)
+            age_fig_country = px.bar(x=list(age_group_counts_country.index), y=list(age_group_counts_country.values), title=f'Viewership Distribution by Age Group (Country) - {selected_country}')
             age_fig_country.update_layout(title_x=0.5, xaxis_title='Age Group', yaxis_title='Viewership')
             
-            age_group_counts_continent = {age_group: sum(record['Viewership'] for record in filtered_data_continent if age_group == record['Age']) for age_group in age_groups.values()}
-            age_group_counts_sorted_continent = {k: age_group_counts_continent[k] for k in sorted(age_group_counts_continent.keys())}
-            age_fig_continent = px.pie(names=list(age_group_counts_sorted_continent.keys()), values=list(age_group_counts_sorted_continent.values()), title=f'Viewership Distribution by Age Group (Continent) - {selected_continent}')
+            age_group_counts_continent = age_group_counts_continent.reindex(sorted(age_groups.values()), fill_value=0)
+            age_fig_continent = px.pie(names=list(age_group_counts_continent.index), values=list(age_group_counts_continent.values), title=f'Viewership Distribution by Age Group (Continent) - {selected_continent}')
             
             return dcc.Graph(figure=age_fig_country), dcc.Graph(figure=age_fig_continent)
         elif selected_demographic == 'Gender':
             # Count gender distribution
-            gender_counts_country = {gender: sum(record['Viewership'] for record in filtered_data_country if record['Gender'] == gender) for gender in ['Male', 'Female']}
-            gender_fig_country = px.bar(x=list(gender_counts_country.keys()), y=list(gender_counts_country.values()), title=f'Viewership Distribution by Gender (Country) - {selected_country}')
+            gender_counts_country, gender_counts_continent = data.panels([('Gender', country_filters), ('Gender', continent_filters)])
+            gender_counts_country = gender_counts_country.reindex(['Male', 'Female'], fill_value=0)
+            gender_fig_country = px.bar(x=list(gender_counts_country.index), y=list(gender_counts_country.values), title=f'Viewership Distribution by Gender (Country) - {selected_country}')
             gender_fig_country.update_layout(title_x=0.5, xaxis_title='Gender', yaxis_title='Viewership')
             
-            gender_counts_continent = {gender: sum(record['Viewership'] for record in filtered_data_continent if record['Gender'] == gender) for gender in ['Male', 'Female']}
-            gender_fig_continent = px.pie(names=list(gender_counts_continent.keys()), values=list(gender_counts_continent.values()), title=f'Viewership Distribution by Gender (Continent) - {selected_continent}')
+            gender_counts_continent = gender_counts_continent.reindex(['Male', 'Female'], fill_value=0)
+            gender_fig_continent = px.pie(names=list(gender_counts_continent.index), values=list(gender_counts_continent.values), title=f'Viewership Distribution by Gender (Continent) - {selected_continent}')
             
             return dcc.Graph(figure=gender_fig_country), dcc.Graph(figure=gender_fig_continent)
         else:
             return None, None
 
+def layout(source):
+    data = source.current()
+    continents = data.values('Continent')
+
     return html.Div([
         html.Div([
             html.Label('Select Demographic:'),
@@ -86,10 +86,11 @@ def layout(app, data):
                 html.Label('Select Country:'),
                 dcc.Dropdown(
                     id='country-demographic-dropdown',
-                    options=[{'label': country, 'value': country} for country in countries],
+                    options=dropdown_options(data, 'Country'),
                     value=None,
                     style={'width': '100%', 'font-size': '14px'}
                 ),
+                *search_store(data, 'country-demographic-dropdown', 'Country'),
                 html.Div(id='country-demographic-output', style={'width': '100%', 'display': 'inline-block'})
             ], style={'flex': '1', 'display': 'inline-block', 'margin-right': '20px'}),
             html.Div([
@@ -1,91 +1,78 @@
-from dash import dcc, html, Input, Output
-import plotly.express as px
+from dash import dcc, html, ClientsideFunction, Input, Output, State
+from dataset.topn import top_n
+from tabs.approximate import approximate_note, error_bars
+from tabs.cache import figure_cache
+from tabs.limits import chart_limits
+from tabs.search import dropdown_options, register_search, search_store
 
-def layout(app, data):
-    countries = sorted(set(record['Country'] for record in data))
-    continents = sorted(set(record['Continent'] for record in data))
+def register_callbacks(app, source):
+    register_search(app, source, 'country-device-dropdown', 'Country', ['All Countries'])
 
-    @app.callback(
-        Output('continent-dropdown', 'options'),
-        [Input('country-device-dropdown', 'value')]
-    )
-    def update_continent_options(selected_country):
-        if selected_country is None:
-            continent_options = [{'label': continent, 'value': continent} for continent in continents + ['All Continents']]
-        else:
-            selected_country_continent = None
-            for record in data:
-                if record['Country'] == selected_country:
-                    selected_country_continent = record['Continent']
-                    break
-            continent_options = [{'label': continent, 'value': continent} for continent in continents]
-            if selected_country_continent not in continents:
-                continent_options.append({'label': selected_country_continent, 'value': selected_country_continent})
-            continent_options.append({'label': 'All Continents', 'value': 'All Continents'})
-
-        return continent_options
-
-    @app.callback(
+    app.clientside_callback(
+        ClientsideFunction(namespace='cascade', function_name='continentOf'),
         Output('continent-dropdown', 'value'),
-        [Input('country-device-dropdown', 'value')]
+        [Input('country-device-dropdown', 'value')],
+        [State('country-continent-map', 'data')]
     )
-    def update_continent_value(selected_country):
-        if selected_country is None:
-            return None
 
-        for record in data:
-            if record['Country'] == selected_country:
-                return record['Continent']
+    def device_figures(viewership, errors, title_suffix):
+        import plotly.express as px
 
-    def update_visualization(selected_data, title_suffix):
-        if selected_data is None:
-            return None, None
-
-        if selected_data == 'All Countries' or selected_data == 'All Continents':
-            filtered_data = data
-        else:
-            filtered_data = [record for record in data if record['Country'] == selected_data]
+        viewership, errors = top_n(viewership, chart_limits['device'], errors)
+        device_viewership = viewership.reset_index()
+        title_suffix += approximate_note(viewership, errors)
 
         # Bar chart for viewership distribution by device type
-        device_counts = {}
-        for record in filtered_data:
-            device = record['User Agents']
-            device_counts[device] = device_counts.get(device, 0) + record['Viewership']
-
-        bar_fig = px.bar(x=list(device_counts.keys()), y=list(device_counts.values()), title=f'Viewership Distribution by Device Type {title_suffix}')
+        bar_fig = px.bar(x=list(device_viewership['User Agents']), y=list(device_viewership['Viewership']), error_y=error_bars(errors), title=f'Viewership Distribution by Device Type {title_suffix}')
         bar_fig.update_layout(title_x=0.5, xaxis_title='Device Type', yaxis_title='Viewership')
 
         # Pie chart for viewership distribution by device type
-        pie_fig = px.pie(filtered_data, values='Viewership', names='User Agents', title=f'Proportion of Viewership by Device Type {title_suffix}')
+        pie_fig = px.pie(device_viewership, values='Viewership', names='User Agents', title=f'Proportion of Viewership by Device Type {title_suffix}')
         pie_fig.update_layout(title_x=0.5)
 
         return dcc.Graph(figure=bar_fig), dcc.Graph(figure=pie_fig)
 
     @app.callback(
         [Output('country-visualization-output-device', 'children'),
-         Output('country-additional-visualization-output-device', 'children')],
-        [Input('country-device-dropdown', 'value')]
-    )
-    def update_country_visualization(selected_country):
-        return update_visualization(selected_country, f'for {selected_country}' if selected_country else 'for All Countries')
-
-    @app.callback(
-        [Output('continent-visualization-output-device', 'children'),
+         Output('country-additional-visualization-output-device', 'children'),
+         Output('continent-visualization-output-device', 'children'),
          Output('continent-additional-visualization-output-device', 'children')],
-        [Input('continent-dropdown', 'value')]
+        [Input('country-device-dropdown', 'value'),
+         Input('continent-dropdown', 'value')]
     )
-    def update_continent_visualization(selected_continent):
-        return update_visualization(selected_continent, f'in {selected_continent}' if selected_continent else 'for All Continents')
+    @figure_cache.memoize(source, inputs=lambda data: data.dimensions.cascade_pairs('All Countries', 'All Continents'))
+    def update_visualization_device(selected_country, selected_continent):
+        data = source.current()
+        country_filters = {} if selected_country in (None, 'All Countries') else {'Country': selected_country}
+        continent_filters = {} if selected_continent in (None, 'All Continents') else {'Continent': selected_continent}
+        (country_viewership, country_errors), (continent_viewership, continent_errors) = data.estimate_panels([('User Agents', country_filters), ('User Agents', continent_filters)])
+
+        if selected_country is None:
+            country_figures = (None, None)
+        else:
+            country_figures = device_figures(country_viewership, country_errors, f'for {selected_country}')
+
+        if selected_continent is None:
+            continent_figures = (None, None)
+        else:
+            continent_figures = device_figures(continent_viewership, continent_errors, f'in {selected_continent}')
+
+        return country_figures + continent_figures
+
+def layout(source):
+    data = source.current()
+    continents = data.values('Continent')
 
     return html.Div([
         html.Div([
             html.Label('Select Country:'),
             dcc.Dropdown(
                 id='country-device-dropdown',
-                options=[{'label': country, 'value': country} for country in countries + ['All Countries']],
+                options=dropdown_options(data, 'Country', ['All Countries']),
                 value=None,
                 style={'width': '300px', 'font-size': '14px'}
             ),
+            *search_store(data, 'country-device-dropdown', 'Country'),
             html.Div(id='country-visualization-output-device', style={'width': '48%', 'display': 'inline-block'}),
             html.Div(id='country-additional-visualization-output-device', style={'width': '48%', 'display': 'inline-block'})
         ], style={'width': '100%', 'display': 'flex', 'align-items': 'center', 'justify-content': 'center'}),
@@ -0,0 +1,7 @@
+# Most slices each categorical chart draws before its smallest values are folded into 'Other'; None draws every value.
+# app.py overrides them from TOP_N_<CHART> environment variables. The map keeps only its largest countries instead
+chart_limits = {
+    'referrer': 10,
+    'device': 10,
+    'country': None,
+}
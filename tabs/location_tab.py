@@ -1,9 +1,17 @@
 from dash import dcc, html, Input, Output
-import plotly.express as px
+from dataset.topn import top_n
+from tabs.approximate import approximate_note, error_bars
+from tabs.cache import figure_cache
+from tabs.limits import chart_limits
+from tabs.search import dropdown_options, register_search, search_store
 
-def layout(app, data):
-    continents = sorted(set(record['Continent'] for record in data))
-    countries_by_continent = {continent: sorted(set(record['Country'] for record in data if record['Continent'] == continent)) for continent in continents}
+def register_callbacks(app, source):
+    register_search(app, source, 'sport-dropdown', 'Sport')
+    register_search(app, source, 'country-dropdown', 'Country')
+
+    def location_inputs(data):
+        # Sport and country are picked independently, so every pair is reachable, unset included
+        return [(sport, country) for sport in [None] + data.values('Sport') for country in [None] + data.values('Country')]
 
     @app.callback(
         [Output('visualization-output-loc', 'children'),
@@ -11,41 +19,51 @@ def layout(app, data):
         [Input('sport-dropdown', 'value'),
          Input('country-dropdown', 'value')]
     )
+    @figure_cache.memoize(source, inputs=location_inputs)
     def update_visualization_location(selected_sport, selected_country):
+        import plotly.express as px
+
+        data = source.current()
+        continents = data.values('Continent')
         # Filter data by selected country and sport
-        filtered_data = data
-        
-        if selected_sport:
-            filtered_data = [record for record in filtered_data if record['Sport'] == selected_sport]
-        
-        if selected_country:
-            filtered_data = [record for record in filtered_data if record['Country'] == selected_country]
+        filters = {'Sport': selected_sport or None, 'Country': selected_country or None}
+        (country_viewership, country_errors), (continent_viewership, continent_errors) = data.estimate_panels([('Country', filters), ('Continent', filters)])
+        country_note = approximate_note(country_viewership, country_errors)
+        # A map has nowhere to draw 'Other', so countries beyond the limit are left blank
+        country_viewership = top_n(country_viewership, chart_limits['country'], other=False)[0].reset_index()
 
         # Choropleth map
-        map_fig = px.choropleth(filtered_data, locations='Country', locationmode='country names', color='Viewership', hover_name='Country')
-        map_fig.update_layout(title_text='Viewership Distribution by Country', title_x=0.5)
+        map_fig = px.choropleth(country_viewership, locations='Country', locationmode='country names', color='Viewership', hover_name='Country')
+        map_fig.update_layout(title_text=f'Viewership Distribution by Country{country_note}', title_x=0.5)
         map_fig.update_geos(showcountries=True)
         
         # Bar chart for viewership by continent
-        continent_viewership = {continent: sum(record['Viewership'] for record in filtered_data if record['Continent'] == continent) for continent in continents}
-        bar_fig = px.bar(x=list(continent_viewership.keys()), y=list(continent_viewership.values()), labels={'x':'Continent', 'y':'Viewership'})
-        bar_fig.update_layout(title_text='Viewership by Continent', title_x=0.5, xaxis_title='Continent', yaxis_title='Viewership')
+        continent_note = approximate_note(continent_viewership, continent_errors)
+        continent_viewership = continent_viewership.reindex(continents, fill_value=0)
+        if continent_errors is not None:
+            continent_errors = continent_errors.reindex(continents, fill_value=0)
+        bar_fig = px.bar(x=list(continent_viewership.index), y=list(continent_viewership.values), error_y=error_bars(continent_errors), labels={'x':'Continent', 'y':'Viewership'})
+        bar_fig.update_layout(title_text=f'Viewership by Continent{continent_note}', title_x=0.5, xaxis_title='Continent', yaxis_title='Viewership')
 
         return dcc.Graph(figure=map_fig), dcc.Graph(figure=bar_fig)
 
+def layout(source):
+    data = source.current()
     return html.Div([
         html.Label('Select Sport:'),
         dcc.Dropdown(
             id='sport-dropdown',
-            options=[{'label': sport, 'value': sport} for sport in sorted(set(record['Sport'] for record in data))],
+            options=dropdown_options(data, 'Sport'),
             value=None
         ),
+        *search_store(data, 'sport-dropdown', 'Sport'),
         html.Label('Select Country:'),
         dcc.Dropdown(
             id='country-dropdown',
-            options=[{'label': country, 'value': country} for country in sorted(set(record['Country'] for record in data))],
+            options=dropdown_options(data, 'Country'),
             value=None
         ),
+        *search_store(data, 'country-dropdown', 'Country'),
         html.Div([
             html.Div(id='visualization-output-loc', style={'width': '48%', 'display': 'inline-block'}),
             html.Div(id='additional-visualization-output-loc', style={'width': '48%', 'display': 'inline-block'})
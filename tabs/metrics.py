@@ -0,0 +1,151 @@
+import bisect
+import contextvars
+import functools
+import threading
+import time
+
+from flask import Response, g, has_request_context
+
+from dataset import scan
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+ROW_BUCKETS = (0, 100, 1000, 10000, 100000, 1000000, 10000000)
+BYTE_BUCKETS = (1 << 10, 4 << 10, 16 << 10, 64 << 10, 256 << 10, 1 << 20, 4 << 20)
+
+# Figure cache outcome and figure build time of the current callback call, both reported by the figure cache
+_call = contextvars.ContextVar('callback_call', default=None)
+
+
+class Histogram:
+    def __init__(self, name, help, buckets):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label, value):
+        with self._lock:
+            series = self._series.setdefault(label, [[0] * (len(self.buckets) + 1), 0.0])
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((label, list(counts), total) for label, (counts, total) in self._series.items())
+        for label, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{callback="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{callback="{label}"}} {total}')
+            lines.append(f'{self.name}_count{{callback="{label}"}} {cumulative}')
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label):
+        with self._lock:
+            self._values[label] = self._values.get(label, 0) + 1
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock:
+            values = sorted(self._values.items())
+        lines += [f'{self.name}{{callback="{label}"}} {value}' for label, value in values]
+        return lines
+
+
+class CallbackMetrics:
+    def __init__(self):
+        self.seconds = Histogram('dash_callback_seconds', 'Wall time of each callback call.', LATENCY_BUCKETS)
+        self.rows = Histogram('dash_callback_rows_scanned', 'Dataset rows read per callback call.', ROW_BUCKETS)
+        self.figure_seconds = Histogram('dash_callback_figure_seconds', 'Time spent building figures on cache misses.', LATENCY_BUCKETS)
+        self.response_bytes = Histogram('dash_callback_response_bytes', 'Serialized size of callback responses.', BYTE_BUCKETS)
+        self.cache_hits = Counter('dash_callback_cache_hits_total', 'Callback calls answered from the figure cache.')
+        self.cache_misses = Counter('dash_callback_cache_misses_total', 'Callback calls that built their figures.')
+
+    def wrap(self, function):
+        name = f'{function.__module__}.{function.__name__}'
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            call = {}
+            token = _call.set(call)
+            started = time.perf_counter()
+            try:
+                with scan.counting() as rows:
+                    result = function(*args, **kwargs)
+            finally:
+                _call.reset(token)
+                self.seconds.observe(name, time.perf_counter() - started)
+                self.rows.observe(name, rows[0])
+                if has_request_context():
+                    # The response size is only known once Dash has serialized it, see after_request
+                    g.callback_name = name
+            # Calls that raised, PreventUpdate included, or never went through the figure cache count as neither
+            if 'cache_miss' in call:
+                (self.cache_misses if call['cache_miss'] else self.cache_hits).inc(name)
+            if 'figure_seconds' in call:
+                self.figure_seconds.observe(name, call['figure_seconds'])
+            return result
+        return wrapper
+
+    def instrument(self, app, source):
+        # Must run before any tab registers, so every later @app.callback is wrapped
+        register = app.callback
+
+        @functools.wraps(register)
+        def callback(*args, **kwargs):
+            decorator = register(*args, **kwargs)
+            return lambda function: decorator(self.wrap(function))
+        app.callback = callback
+
+        @app.server.after_request
+        def record_response_bytes(response):
+            name = g.pop('callback_name', None)
+            if name is not None and not response.direct_passthrough:
+                self.response_bytes.observe(name, len(response.get_data()))
+            return response
+
+        @app.server.route('/metrics')
+        def metrics():
+            return Response('\n'.join(self.expose(source)) + '\n', mimetype='text/plain; version=0.0.4')
+
+    def expose(self, source):
+        lines = []
+        for metric in (self.seconds, self.rows, self.figure_seconds, self.response_bytes, self.cache_hits, self.cache_misses):
+            lines += metric.expose()
+        data = source.current()
+        gauges = [
+            ('dataset_version', 'Version of the published snapshot.', source.version),
+            ('dataset_rows', 'Rows in the published snapshot.', len(data) if data is not None else 0),
+            ('dataset_last_refresh_seconds', 'Duration of the last refresh or append.', source.last_refresh_seconds),
+        ]
+        for name, help, value in gauges:
+            if value is not None:
+                lines += [f'# HELP {name} {help}', f'# TYPE {name} gauge', f'{name} {value}']
+        return lines
+
+
+def note_cache(hit):
+    # Any miss within a call makes it a miss
+    call = _call.get()
+    if call is not None:
+        call['cache_miss'] = call.get('cache_miss', False) or not hit
+
+
+def note_figure(seconds):
+    call = _call.get()
+    if call is not None:
+        call['figure_seconds'] = call.get('figure_seconds', 0) + seconds
+
+
+callback_metrics = CallbackMetrics()
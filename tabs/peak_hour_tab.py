@@ -1,42 +1,46 @@
-from dash import dcc, html, Input, Output, State
-import plotly.express as px
+from dash import dcc, html, ClientsideFunction, Input, Output, State
+from dataset.hours import HOURS
+from tabs.cache import figure_cache
+from tabs.search import dropdown_options, register_search, search_store
 
-def layout(app, data):
-    countries = sorted(set(record['Country'] for record in data))
-    continents = sorted(set(record['Continent'] for record in data))
+def register_callbacks(app, source):
+    register_search(app, source, 'country-peak-hour-dropdown', 'Country')
 
-    @app.callback(
+    # Cascades run in the browser from the country -> continent map shipped with the page
+    app.clientside_callback(
+        ClientsideFunction(namespace='cascade', function_name='continentOptions'),
         Output('continent-peak-hour-dropdown', 'options'),
-        [Input('country-peak-hour-dropdown', 'value')]
+        [Input('country-peak-hour-dropdown', 'value')],
+        [State('country-continent-map', 'data')]
     )
-    def update_continent_options(selected_country):
-        if selected_country:
-            filtered_continents = set(record['Continent'] for record in data if record['Country'] == selected_country)
-            return [{'label': continent, 'value': continent} for continent in continents if continent in filtered_continents]
-        else:
-            return [{'label': continent, 'value': continent} for continent in continents]
 
-    @app.callback(
-        [Output('continent-peak-hour-dropdown', 'value')],
-        [Input('country-peak-hour-dropdown', 'value')]
+    app.clientside_callback(
+        ClientsideFunction(namespace='cascade', function_name='continentOf'),
+        Output('continent-peak-hour-dropdown', 'value'),
+        [Input('country-peak-hour-dropdown', 'value')],
+        [State('country-continent-map', 'data')]
     )
-    def update_selected_continent(selected_country):
-        if selected_country:
-            # Find the first continent corresponding to the selected country
-            for record in data:
-                if record['Country'] == selected_country:
-                    return [record['Continent']]
-        return [None]
+
+    def peak_hour_inputs(data):
+        # Over the full hour range the tab opens with
+        return [pair + ([0, HOURS],) for pair in data.dimensions.cascade_pairs()]
 
     @app.callback(
         [Output('visualization-output-peak-hour', 'children'),
          Output('additional-visualization-output-peak-hour', 'children')],
         [Input('country-peak-hour-dropdown', 'value'),
-         Input('continent-peak-hour-dropdown', 'value')]
+         Input('continent-peak-hour-dropdown', 'value'),
+         Input('peak-hour-range', 'value')]
     )
-    def update_visualization_peak_hour(selected_country, selected_continent):
-        filtered_data_country = [record for record in data if (selected_country is None or record['Country'] == selected_country)]
-        filtered_data_continent = [record for record in data if (selected_continent is None or record['Continent'] == selected_continent)]
+    @figure_cache.memoize(source, inputs=peak_hour_inputs)
+    def update_visualization_peak_hour(selected_country, selected_continent, selected_hours):
+        import plotly.express as px
+
+        data = source.current()
+        # Served from the per-hour index, so the cost does not grow with the number of records
+        hours = None if selected_hours is None or list(selected_hours) == [0, HOURS] else tuple(selected_hours)
+        filtered_data_country = data.hour_histogram({'Country': selected_country}, hours).reset_index()
+        filtered_data_continent = data.hour_histogram({'Continent': selected_continent}, hours).reset_index()
 
         # Histogram for viewership distribution over peak usage hours (for country)
         hist_fig_country = px.bar(filtered_data_country, x='Peak Usage Hours', y='Viewership', title=f'Viewership Distribution over Peak Usage Hours in {selected_country}')
@@ -48,19 +52,34 @@ def layout(app, data):
 
         return dcc.Graph(figure=hist_fig_country), dcc.Graph(figure=hist_fig_continent)
 
+def layout(source):
+    data = source.current()
+    continents = data.values('Continent')
+
     return html.Div([
         html.Label('Select Country:'),
         dcc.Dropdown(
             id='country-peak-hour-dropdown',
-            options=[{'label': country, 'value': country} for country in countries],
+            options=dropdown_options(data, 'Country'),
             value=None
         ),
+        *search_store(data, 'country-peak-hour-dropdown', 'Country'),
         html.Label('Select Continent:'),
         dcc.Dropdown(
             id='continent-peak-hour-dropdown',
             options=[{'label': continent, 'value': continent} for continent in continents],
             value=None
         ),
+        html.Label('Select Hours:'),
+        dcc.RangeSlider(
+            id='peak-hour-range',
+            min=0,
+            max=HOURS,
+            step=1,
+            value=[0, HOURS],
+            marks={hour: f'{hour:02d}:00' for hour in range(0, HOURS + 1, 3)},
+            allowCross=False
+        ),
         html.Div([
             html.Div(id='visualization-output-peak-hour', style={'width': '48%', 'display': 'inline-block'}),
             html.Div(id='additional-visualization-output-peak-hour', style={'width': '48%', 'display': 'inline-block'})
@@ -0,0 +1,76 @@
+import logging
+import multiprocessing
+import pickle
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from tabs.cache import figure_cache
+
+logger = logging.getLogger(__name__)
+
+
+def _compute(name, args, fingerprint):
+    # Runs in a forked pool process, which inherited the registered callbacks and the snapshot being warmed
+    function, _, source = figure_cache.warmable[name]
+    if source.current().fingerprint != fingerprint:
+        return None
+    return pickle.dumps(function(*args), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class Prewarmer:
+    # Computes every enumerable callback input for a new snapshot in a process pool and stores the figures in the cache
+    def __init__(self, cache, source, workers=4):
+        self.cache = cache
+        self.source = source
+        self.workers = workers
+        self.progress = {'version': None, 'done': 0, 'failed': 0, 'total': 0, 'seconds': None}
+
+    def __call__(self, dataset):
+        # Snapshot listener: warming runs off the publishing thread
+        threading.Thread(target=self.run, args=(dataset,), name='figure-prewarm', daemon=True).start()
+
+    def run(self, dataset):
+        started = time.perf_counter()
+        fingerprint = dataset.fingerprint
+        tasks = []
+        enumerated = 0
+        for name, (_, inputs, _) in self.cache.warmable.items():
+            for args in inputs(dataset):
+                enumerated += 1
+                key = self.cache.key(name, fingerprint, args)
+                if not self.cache.contains(key):
+                    tasks.append((name, tuple(args), key))
+        if enumerated > self.cache.memory.max_entries:
+            logger.warning('%d figures to pre-warm but FIGURE_CACHE_ENTRIES is %d; the earliest will be evicted', enumerated, self.cache.memory.max_entries)
+        self.progress = progress = {'version': dataset.version, 'done': 0, 'failed': 0, 'total': len(tasks), 'seconds': None}
+        logger.info('Pre-warming %d figures for dataset version %s', len(tasks), dataset.version)
+        stored_bytes = 0
+
+        # fork, so pool processes start from this snapshot and the registered callbacks without re-importing the app
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(self.workers, mp_context=context) as pool:
+            futures = {pool.submit(_compute, name, args, fingerprint): key for name, args, key in tasks}
+            for future in as_completed(futures):
+                if self.source.current() is not dataset:
+                    # Superseded by a newer snapshot, which gets its own run
+                    for pending in futures:
+                        pending.cancel()
+                    logger.info('Pre-warm for dataset version %s superseded after %d of %d figures', dataset.version, progress['done'], progress['total'])
+                    return
+                progress['done'] += 1
+                try:
+                    payload = future.result()
+                except Exception:
+                    progress['failed'] += 1
+                    logger.exception('Pre-warming %s failed', futures[future])
+                    continue
+                if payload is not None:
+                    self.cache.store(futures[future], pickle.loads(payload), payload)
+                    stored_bytes += len(payload)
+                if progress['done'] % 50 == 0:
+                    logger.info('Pre-warmed %d of %d figures', progress['done'], progress['total'])
+        progress['seconds'] = time.perf_counter() - started
+        logger.info('Pre-warmed %d figures (%d failed) for dataset version %s in %.1fs', progress['done'], progress['failed'], dataset.version, progress['seconds'])
+        if stored_bytes > self.cache.memory.max_bytes:
+            logger.warning('Pre-warmed %d bytes of figures but FIGURE_CACHE_BYTES is %d; the earliest were evicted', stored_bytes, self.cache.memory.max_bytes)
@@ -1,65 +1,35 @@
-from dash import dcc, html, Input, Output
-import plotly.express as px
-
-def layout(app, data):
-    countries = sorted(set(record['Country'] for record in data))
-    continents = sorted(set(record['Continent'] for record in data))
-
-    @app.callback(
-        Output('continent-referrer-dropdown', 'options'),
-        [Input('country-referrer-dropdown', 'value')]
-    )
-    def update_continent_options(selected_country):
-        if selected_country is None:
-            continent_options = [{'label': continent, 'value': continent} for continent in continents + ['All Continents']]
-        else:
-            selected_country_continent = None
-            for record in data:
-                if record['Country'] == selected_country:
-                    selected_country_continent = record['Continent']
-                    break
-            continent_options = [{'label': continent, 'value': continent} for continent in continents]
-            if selected_country_continent not in continents:
-                continent_options.append({'label': selected_country_continent, 'value': selected_country_continent})
-            continent_options.append({'label': 'All Continents', 'value': 'All Continents'})
-
-        return continent_options
-
-    @app.callback(
+from dash import dcc, html, ClientsideFunction, Input, Output, State
+from dataset.topn import top_n
+from tabs.approximate import approximate_note, error_bars
+from tabs.cache import figure_cache
+from tabs.limits import chart_limits
+from tabs.search import dropdown_options, register_search, search_store
+
+def register_callbacks(app, source):
+    register_search(app, source, 'country-referrer-dropdown', 'Country', ['All Countries'])
+
+    # Continent options never depend on the country, so only the value cascades, in the browser
+    app.clientside_callback(
+        ClientsideFunction(namespace='cascade', function_name='continentOf'),
         Output('continent-referrer-dropdown', 'value'),
-        [Input('country-referrer-dropdown', 'value')]
+        [Input('country-referrer-dropdown', 'value')],
+        [State('country-continent-map', 'data')]
     )
-    def update_continent_value(selected_country):
-        if selected_country is None:
-            return None
-
-        for record in data:
-            if record['Country'] == selected_country:
-                return record['Continent']
 
-    @app.callback(
-        [Output('country-visualization-output-referrer', 'children'),
-         Output('country-additional-visualization-output-referrer', 'children')],
-        [Input('country-referrer-dropdown', 'value')]
-    )
-    def update_country_visualization(selected_country):
-        if selected_country is None:
-            return None, None
+    def referrer_figures(viewership, errors, title_suffix):
+        import plotly.express as px
 
-        if selected_country == 'All Countries':
-            filtered_data = data
-            title_suffix = 'for All Countries'
-        else:
-            filtered_data = [record for record in data if record['Country'] == selected_country]
-            title_suffix = f'in {selected_country}'
+        # The long tail of values is folded into one slice so the figure stays small whatever the cardinality
+        viewership, errors = top_n(viewership, chart_limits['referrer'], errors)
+        referrer_viewership = viewership.reset_index()
+        title_suffix += approximate_note(viewership, errors)
 
         # Pie chart for viewership distribution by referrer
-        pie_fig = px.pie(filtered_data, values='Viewership', names='Referrer', title=f'Viewership Distribution by Referrer {title_suffix}')
+        pie_fig = px.pie(referrer_viewership, values='Viewership', names='Referrer', title=f'Viewership Distribution by Referrer {title_suffix}')
         pie_fig.update_layout(title_x=0.5)
 
-        # Bar chart for viewership distribution by referrer in the selected country
-        referrer_counts = {referrer: sum(record['Viewership'] for record in filtered_data if record['Referrer'] == referrer) for referrer in set(record['Referrer'] for record in filtered_data)}
-        bar_fig = px.bar(x=list(referrer_counts.keys()), y=list(referrer_counts.values()), title=f'Viewership by Referrer {title_suffix}')
+        # Bar chart for viewership distribution by referrer in the selected country or continent
+        bar_fig = px.bar(x=list(referrer_viewership['Referrer']), y=list(referrer_viewership['Viewership']), error_y=error_bars(errors), title=f'Viewership by Referrer {title_suffix}')
         bar_fig.update_layout(title_x=0.5, xaxis_title='Referrer', yaxis_title='Viewership')
 
         # Fix the template to avoid the marker pattern shape issue
@@ -67,45 +37,51 @@ def layout(app, data):
 
         return dcc.Graph(figure=pie_fig), dcc.Graph(figure=bar_fig)
 
+    # One callback for both rows: a country pick also moves the continent, and Dash waits for that
+    # clientside update so the pair arrives as a single request answered from one pass over the cube
     @app.callback(
-        [Output('continent-visualization-output-referrer', 'children'),
+        [Output('country-visualization-output-referrer', 'children'),
+         Output('country-additional-visualization-output-referrer', 'children'),
+         Output('continent-visualization-output-referrer', 'children'),
          Output('continent-additional-visualization-output-referrer', 'children')],
-        [Input('continent-referrer-dropdown', 'value')]
+        [Input('country-referrer-dropdown', 'value'),
+         Input('continent-referrer-dropdown', 'value')]
     )
-    def update_continent_visualization(selected_continent):
-        if selected_continent is None:
-            return None, None
+    @figure_cache.memoize(source, inputs=lambda data: data.dimensions.cascade_pairs('All Countries', 'All Continents'))
+    def update_visualization_referrer(selected_country, selected_continent):
+        data = source.current()
+        country_filters = {} if selected_country in (None, 'All Countries') else {'Country': selected_country}
+        continent_filters = {} if selected_continent in (None, 'All Continents') else {'Continent': selected_continent}
+        (country_viewership, country_errors), (continent_viewership, continent_errors) = data.estimate_panels([('Referrer', country_filters), ('Referrer', continent_filters)])
 
-        if selected_continent == 'All Continents':
-            filtered_data = data
-            title_suffix = 'for All Continents'
+        if selected_country is None:
+            country_figures = (None, None)
         else:
-            filtered_data = [record for record in data if record['Continent'] == selected_continent]
-            title_suffix = f'in {selected_continent}'
-
-        # Pie chart for viewership distribution by referrer
-        pie_fig = px.pie(filtered_data, values='Viewership', names='Referrer', title=f'Viewership Distribution by Referrer {title_suffix}')
-        pie_fig.update_layout(title_x=0.5)
+            title_suffix = 'for All Countries' if selected_country == 'All Countries' else f'in {selected_country}'
+            country_figures = referrer_figures(country_viewership, country_errors, title_suffix)
 
-        # Bar chart for viewership distribution by referrer in the selected continent
-        referrer_counts = {referrer: sum(record['Viewership'] for record in filtered_data if record['Referrer'] == referrer) for referrer in set(record['Referrer'] for record in filtered_data)}
-        bar_fig = px.bar(x=list(referrer_counts.keys()), y=list(referrer_counts.values()), title=f'Viewership by Referrer {title_suffix}')
-        bar_fig.update_layout(title_x=0.5, xaxis_title='Referrer', yaxis_title='Viewership')
+        if selected_continent is None:
+            continent_figures = (None, None)
+        else:
+            title_suffix = 'for All Continents' if selected_continent == 'All Continents' else f'in {selected_continent}'
+            continent_figures = referrer_figures(continent_viewership, continent_errors, title_suffix)
 
-        # Fix the template to avoid the marker pattern shape issue
-        bar_fig.update_layout(template='plotly')
+        return country_figures + continent_figures
 
-        return dcc.Graph(figure=pie_fig), dcc.Graph(figure=bar_fig)
+def layout(source):
+    data = source.current()
+    continents = data.values('Continent')
 
     return html.Div([
         html.Div([
             html.Label('Select Country:'),
             dcc.Dropdown(
                 id='country-referrer-dropdown',
-                options=[{'label': country, 'value': country} for country in countries + ['All Countries']],
+                options=dropdown_options(data, 'Country', ['All Countries']),
                 value=None,
                 style={'width': '300px', 'font-size': '14px'}
             ),
+            *search_store(data, 'country-referrer-dropdown', 'Country'),
             html.Div(id='country-visualization-output-referrer', style={'width': '48%', 'display': 'inline-block'}),
             html.Div(id='country-additional-visualization-output-referrer', style={'width': '48%', 'display': 'inline-block'})
         ], style={'width': '100%', 'display': 'flex', 'align-items': 'center', 'justify-content': 'center'}),
@@ -0,0 +1,60 @@
+from dash import dcc, ClientsideFunction, Input, Output, State
+
+# Dropdowns with more options than 'above' ship only the first 'matches' of them and look the rest up as the user
+# types; app.py overrides 'above' from DROPDOWN_SEARCH_ABOVE
+dropdown_search = {
+    'above': 200,
+    'matches': 20,
+}
+
+
+def _options(values):
+    return [{'label': value, 'value': value} for value in values]
+
+
+def _searched(data, column):
+    return len(data.values(column)) > dropdown_search['above']
+
+
+def _store_id(dropdown_id):
+    return f'{dropdown_id}-search'
+
+
+def dropdown_options(data, column, extras=()):
+    # Options for the initial layout: the full list when it is short, otherwise the first page of it
+    values = data.values(column)
+    if _searched(data, column):
+        values = values[:dropdown_search['matches']]
+    return _options(values + list(extras))
+
+
+def search_store(data, dropdown_id, column):
+    # Placed beside the dropdown only when its list is long. Short lists get no store, so the browser never
+    # forwards their keystrokes and filters the shipped options itself
+    return [dcc.Store(id=_store_id(dropdown_id))] if _searched(data, column) else []
+
+
+def register_search(app, source, dropdown_id, column, extras=()):
+    # Dash skips callbacks whose output is missing from the page, so the store gates the server round trip
+    app.clientside_callback(
+        ClientsideFunction(namespace='search', function_name='forward'),
+        Output(_store_id(dropdown_id), 'data'),
+        [Input(dropdown_id, 'search_value')],
+        prevent_initial_call=True
+    )
+
+    @app.callback(
+        Output(dropdown_id, 'options'),
+        [Input(_store_id(dropdown_id), 'data')],
+        [State(dropdown_id, 'value')],
+        prevent_initial_call=True
+    )
+    def search_options(search_value, value):
+        data = source.current()
+        prefix = (search_value or '').strip()
+        values = data.dimensions.search(column, prefix, dropdown_search['matches'])
+        values += [extra for extra in extras if extra.lower().startswith(prefix.lower())]
+        # The selected value stays among the options so the dropdown can still show its label
+        if value is not None and value not in values:
+            values.append(value)
+        return _options(values)
@@ -1,35 +1,34 @@
 from dash import dcc, html, Input, Output
 import plotly.graph_objs as go
-import plotly.express as px
+from tabs.cache import figure_cache
 
-def layout(app, data):
+def register_callbacks(app, source):
     @app.callback(
         Output('summary-stats', 'children'),
         [Input('summary-stats', 'id')]
     )
+    @figure_cache.memoize(source, inputs=lambda data: [('summary-stats',)])
     def generate_summary_stats(_):
-        viewership_values = [record['Viewership'] for record in data]
-        total_viewership = sum(viewership_values)
-        average_viewership = total_viewership / len(data)
-        maximum_viewership = max(viewership_values)
-        minimum_viewership = min(viewership_values)
+        data = source.current()
+        # Served from running aggregates maintained with the snapshot, so no rows are scanned here
+        summary = data.summary
+        total_viewership = summary.total
+        average_viewership = summary.average
+        maximum_viewership = summary.maximum
+        minimum_viewership = summary.minimum
 
         # Calculate counts for each continent
-        continent_counts = {}
-        for record in data:
-            continent_counts[record['Continent']] = continent_counts.get(record['Continent'], 0) + record['Viewership']
+        continent_counts = summary.by_continent
 
         # Determine the continent with the highest viewership
-        continent_with_highest_viewership = max(continent_counts, key=continent_counts.get)
+        continent_with_highest_viewership = continent_counts.idxmax()
 
         # Create a pie chart for viewership of the most popular sport
         most_popular_sport = ''
         most_popular_sport_viewership = 0
-        sport_counts = {}
-        for record in data:
-            sport_counts[record['Sport']] = sport_counts.get(record['Sport'], 0) + record['Viewership']
-        if sport_counts:
-            most_popular_sport = max(sport_counts, key=sport_counts.get)
+        sport_counts = summary.by_sport
+        if not sport_counts.empty:
+            most_popular_sport = sport_counts.idxmax()
             most_popular_sport_viewership = sport_counts[most_popular_sport]
 
         # Create indicator for continent with highest viewership
@@ -107,6 +106,13 @@ def layout(app, data):
             dcc.Graph(figure=minimum_viewership_fig)
         ])
 
+    # Prebuild the summary for every new snapshot so page loads are served from the cache; the boot snapshot
+    # was published before this listener existed
+    source.subscribe(lambda dataset: generate_summary_stats('summary-stats'))
+    if source.current() is not None:
+        generate_summary_stats('summary-stats')
+
+def layout(source):
     return html.Div([
         html.Div(id='summary-stats')
     ])
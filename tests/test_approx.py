@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from dataset import approx, synthetic
+from dataset.store import Dataset
+
+
+@pytest.fixture
+def settings():
+    yield approx.settings
+    approx.settings.configure()
+
+
+def build(settings, **options):
+    settings.configure(**options)
+    return Dataset.from_records(list(synthetic.generate(20000)))
+
+
+def test_sample_is_used_only_when_it_reads_fewer_rows(settings):
+    age = {'Age': '18-25'}
+    # 200 rows per country make the sample larger than either exact path, so both stay exact
+    data = build(settings, max_exact_rows=100)
+    assert len(data.sample.frame) > data.cube.rows_to_read('Referrer', age) > 100
+    assert data.estimate('Referrer')[1] is None
+    assert data.estimate('Referrer', age)[1] is None
+    # A smaller sample takes over once the exact path reads more rows than it, but not before
+    data = build(settings, max_exact_rows=100, minimum=5)
+    assert data.cube.rows_to_read('Referrer') < len(data.sample.frame) < data.cube.rows_to_read('Referrer', age)
+    assert data.estimate('Referrer')[1] is None
+    assert data.estimate('Referrer', age)[1] is not None
+    values, errors = data.estimate_panels([('Referrer', {}), ('Referrer', age)])[1]
+    assert errors is not None and values.index.tolist() == errors.index.tolist()
+
+
+def test_full_sample_estimate_is_exact(settings):
+    # Sampling every row leaves nothing to estimate: totals match and the intervals collapse
+    data = build(settings, max_exact_rows=0, rate=1.0)
+    filters = {'Sport': data.values('Sport')[0]}
+    values, errors = data.sample.estimate('Referrer', filters)
+    assert values.to_dict() == data.viewership_by('Referrer', filters).to_dict()
+    assert np.allclose(errors.to_numpy(), 0)
+
+
+def test_estimate_intervals_cover_the_exact_totals(settings):
+    data = build(settings, max_exact_rows=0, rate=0.1, minimum=20)
+    exact = data.viewership_by('Referrer')
+    values, errors = data.sample.estimate('Referrer')
+    assert values.index.tolist() == exact.index.tolist()
+    assert ((values - exact).abs() <= errors).mean() >= 0.8
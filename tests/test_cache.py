@@ -0,0 +1,76 @@
+import os
+import pickle
+import threading
+import time
+
+from tabs.cache import LOCK_STRIPES, DiskCache
+
+
+def payload(size):
+    return pickle.dumps(b'x' * size)
+
+
+def entries(cache):
+    return [name for name in os.listdir(cache.directory) if not name.endswith('.lock')]
+
+
+def test_prune_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=10_000)
+    for number in range(5):
+        cache.set(f'key-{number}', payload(1000))
+        # mtime is the access clock, so keep the writes apart
+        os.utime(cache._path(f'key-{number}'), (number, number))
+    cache.get('key-0')
+    for number in range(5, 12):
+        cache.set(f'key-{number}', payload(1000))
+    assert sum(os.path.getsize(os.path.join(cache.directory, name)) for name in entries(cache)) <= 10_000
+    assert cache.get('key-0') is not None
+    assert cache.get('key-1') is None
+    assert cache.get('key-11') is not None
+
+
+def test_prune_does_not_scan_on_every_write(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=100_000)
+    scans = []
+    prune = cache._prune
+    cache._prune = lambda: (scans.append(1), prune())
+    for number in range(500):
+        cache.set(f'key-{number}', payload(1000))
+    assert len(scans) < 50
+
+
+def test_get_survives_a_concurrent_prune(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path))
+    cache.set('key', payload(10))
+
+    def pruned(path, *args):
+        raise FileNotFoundError(path)
+    monkeypatch.setattr(os, 'utime', pruned)
+    assert cache.get('key') == (b'x' * 10, len(payload(10)))
+
+
+def test_locks_are_striped(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    for number in range(1000):
+        with cache.lock(f'key-{number}'):
+            pass
+    assert len([name for name in os.listdir(cache.directory) if name.endswith('.lock')]) <= LOCK_STRIPES
+
+
+def test_lock_serializes_a_key(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    inside, overlaps = [], []
+
+    def compute():
+        with cache.lock('key'):
+            overlaps.append(len(inside))
+            inside.append(1)
+            time.sleep(0.05)
+            inside.pop()
+
+    threads = [threading.Thread(target=compute) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert overlaps == [0, 0, 0]
@@ -0,0 +1,34 @@
+from dataset import scan, synthetic
+from dataset.cube import Cube
+from dataset.store import Dataset
+
+
+def scanned(query):
+    with scan.counting() as rows:
+        query()
+    return rows[0]
+
+
+def test_panels_record_the_rows_each_panel_reads():
+    data = Dataset.from_records(list(synthetic.generate(5000)))
+    # No cuboid holds Age with Referrer, so both panels are served from the raw frame through the row index
+    requests = [('Referrer', {'Age': '18-25'}), ('Referrer', {'Age': '26-35', 'Gender': 'Female'})]
+    expected = sum(data.index.count(filters) for _, filters in requests)
+    assert 0 < scanned(lambda: data.panels(requests)) == expected < len(data)
+    # Panels from a cuboid read it once per panel, as separate rollups would
+    cuboid_requests = [('Country', {'Sport': 'Swimming'}), ('Continent', {})]
+    cuboid = data.cube.cuboid_for({'Country', 'Continent', 'Sport'})
+    assert scanned(lambda: data.panels(cuboid_requests)) == 2 * len(cuboid)
+
+
+def test_panels_match_rollups():
+    data = Dataset.from_records(list(synthetic.generate(2000)))
+    requests = [('Referrer', {'Age': '18-25'}), ('Sport', {'Country': data.values('Country')[0]}), ('Continent', {})]
+    for panel, (column, filters) in zip(data.panels(requests), requests):
+        assert panel.to_dict() == data.viewership_by(column, filters).to_dict()
+
+
+def test_cube_without_index_scans_the_frame():
+    data = Dataset.from_records(list(synthetic.generate(500)))
+    cube = Cube.build(data.frame, groupings=[])
+    assert scanned(lambda: cube.panels([('Referrer', {'Age': '18-25'})])) == len(data)
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from dataset.dimensions import Dimensions
+from dataset.schema import DIMENSIONS
+
+COUNTRIES = {'Kenya': 'Africa', 'Japan': 'Asia', 'United Kingdom': 'Europe', 'United States': 'North America'}
+
+
+@pytest.fixture
+def dimensions():
+    rows = [{column: '-' for column in DIMENSIONS} | {'Country': country, 'Continent': continent} for country, continent in COUNTRIES.items()]
+    frame = pd.DataFrame(rows)
+    return Dimensions.build(frame.astype('category'))
+
+
+def test_cascade_pairs(dimensions):
+    pairs = dimensions.cascade_pairs()
+    assert pairs[:4] == [('Japan', 'Asia'), ('Kenya', 'Africa'), ('United Kingdom', 'Europe'), ('United States', 'North America')]
+    assert pairs[4:] == [(None, None), (None, 'Africa'), (None, 'Asia'), (None, 'Europe'), (None, 'North America')]
+
+
+def test_cascade_pairs_with_all_options(dimensions):
+    pairs = dimensions.cascade_pairs('All Countries', 'All Continents')
+    assert ('All Countries', None) in pairs
+    assert pairs[-1] == (None, 'All Continents')
+    assert len(pairs) == len(dimensions.cascade_pairs()) + 2
+
+
+@pytest.mark.parametrize('prefix, found', [
+    ('un', ['United Kingdom', 'United States']),
+    ('king', ['United Kingdom']),
+    ('STATES', ['United States']),
+    ('', ['Japan', 'Kenya', 'United Kingdom', 'United States']),
+    ('x', []),
+])
+def test_search_matches_word_starts(dimensions, prefix, found):
+    assert dimensions.search('Country', prefix) == found
+
+
+def test_search_limit_keeps_option_order(dimensions):
+    # Each option is returned once even when several of its words match
+    assert dimensions.search('Country', '', limit=2) == ['Japan', 'Kenya']
+    assert dimensions.search('Country', 'u', limit=1) == ['United Kingdom']
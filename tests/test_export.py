@@ -0,0 +1,49 @@
+import io
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from dataset import export, synthetic
+from dataset.schema import DIMENSIONS, MEASURE
+from dataset.store import Dataset
+
+
+@pytest.fixture(scope='module')
+def data():
+    return Dataset.from_records(list(synthetic.generate(2500)))
+
+
+def read_parquet(chunks):
+    return pq.ParquetFile(io.BytesIO(b''.join(chunks)))
+
+
+@pytest.mark.parametrize('filters', [{}, {'Sport': 'Swimming'}, {'Sport': 'Swimming', 'Country': 'Kenya'}])
+def test_parquet_rows_match_the_filtered_frame(data, filters):
+    rows = data.rows(filters)
+    expected = data.frame if rows is None else data.frame.take(rows)
+    parquet = read_parquet(export.iter_parquet(data, filters, chunk_rows=400))
+    table = parquet.read().to_pandas()
+    assert list(table.columns) == DIMENSIONS + [MEASURE]
+    assert table[MEASURE].tolist() == expected[MEASURE].tolist()
+    assert table['Country'].astype(str).tolist() == expected['Country'].astype(str).tolist()
+    # One row group per chunk keeps the writer's memory bounded
+    assert parquet.metadata.num_row_groups == max(-(-len(expected) // 400), 1)
+
+
+def test_parquet_of_an_empty_selection(data):
+    table = read_parquet(export.iter_parquet(data, {'Country': 'Atlantis'})).read()
+    assert table.num_rows == 0
+    assert table.column_names == DIMENSIONS + [MEASURE]
+
+
+def test_grouped_parquet_matches_the_rollup(data):
+    table = read_parquet(export.iter_parquet(data, {'Continent': 'Africa'}, group_by='Sport')).read().to_pandas()
+    assert dict(zip(table['Sport'], table[MEASURE])) == data.viewership_by('Sport', {'Continent': 'Africa'}).to_dict()
+
+
+def test_csv_matches_parquet(data):
+    filters = {'Sport': 'Swimming'}
+    csv = pd.read_csv(io.StringIO(''.join(export.iter_csv(data, filters, chunk_rows=100))))
+    table = read_parquet(export.iter_parquet(data, filters, chunk_rows=100)).read().to_pandas()
+    assert csv[MEASURE].tolist() == table[MEASURE].tolist()
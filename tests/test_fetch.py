@@ -0,0 +1,105 @@
+import http.server
+import threading
+
+import pytest
+
+from dataset.fetch import Fetcher
+
+BODY = bytes(range(256)) * 1000
+ETAG = '"v1"'
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    # Serves BODY with byte ranges; ranges starting at or past server.refuse_from get the whole body with a 200
+    def log_message(self, *args):
+        pass
+
+    def _headers(self, status, length, extra=()):
+        self.send_response(status)
+        self.send_header('ETag', self.server.etag)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(length))
+        for name, value in extra:
+            self.send_header(name, value)
+        self.end_headers()
+
+    def _unchanged(self):
+        if self.headers.get('If-None-Match') != self.server.etag:
+            return False
+        self.send_response(304)
+        self.end_headers()
+        return True
+
+    def do_HEAD(self):
+        if not self._unchanged():
+            self._headers(200, len(BODY))
+
+    def do_GET(self):
+        if self._unchanged():
+            return
+        requested = self.headers.get('Range')
+        refuse_from = self.server.refuse_from
+        if requested is None or (refuse_from is not None and int(requested[6:].split('-')[0]) >= refuse_from):
+            self._headers(200, len(BODY))
+            self.wfile.write(BODY)
+            return
+        start, end = (int(bound) for bound in requested[6:].split('-'))
+        self._headers(206, end - start + 1, [('Content-Range', f'bytes {start}-{end}/{len(BODY)}')])
+        self.wfile.write(BODY[start:end + 1])
+
+
+@pytest.fixture
+def server():
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.etag = ETAG
+    server.refuse_from = None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def fetcher(server, spool, **options):
+    return Fetcher(f'http://127.0.0.1:{server.server_port}/', str(spool), workers=4, shard_size=16 << 10, **options)
+
+
+def test_sharded_download_is_reassembled_in_order(server, tmp_path):
+    download = fetcher(server, tmp_path).fetch()
+    assert download.etag == ETAG
+    assert b''.join(download.chunks()) == BODY
+
+
+def test_unchanged_etag_is_not_downloaded(server, tmp_path):
+    assert fetcher(server, tmp_path).fetch(ETAG) is None
+
+
+@pytest.mark.parametrize('refuse_from', [0, 100 << 10])
+def test_refused_range_falls_back_to_a_single_get(server, tmp_path, refuse_from):
+    # Refused on the first shard, and after several shards were already handed to the parser
+    server.refuse_from = refuse_from
+    assert b''.join(fetcher(server, tmp_path).fetch().chunks()) == BODY
+
+
+def test_weak_etag_is_not_sharded(server, tmp_path):
+    server.etag = 'W/"v1"'
+    assert b''.join(fetcher(server, tmp_path / 'spool').fetch().chunks()) == BODY
+    assert not (tmp_path / 'spool').exists()
+
+
+def test_concurrent_fetchers_share_the_spool(server, tmp_path):
+    results, errors = [], []
+
+    def run():
+        try:
+            results.append(b''.join(fetcher(server, tmp_path).fetch().chunks()))
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert results == [BODY] * 4
@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+from dataset.hours import HourIndex, parse_hour
+from dataset.schema import DIMENSIONS, MEASURE
+
+
+@pytest.mark.parametrize('label, hour', [
+    ('18:00-19:00', 18),
+    ('07:30-08:30', 7),
+    ('7 PM-8 PM', 19),
+    ('7pm', 19),
+    ('9:00 P.M.', 21),
+    ('12 AM-1 AM', 0),
+    ('12 PM', 12),
+    ('7', None),
+    ('07-08', None),
+    ('13 PM', None),
+    ('24:00', None),
+    ('Evening', None),
+])
+def test_parse_hour(label, hour):
+    assert parse_hour(label) == hour
+
+
+def build(labels):
+    rows = [{column: '-' for column in DIMENSIONS} | {'Country': 'Kenya', 'Continent': 'Africa', 'Peak Usage Hours': label, MEASURE: 10 * (position + 1)}
+            for position, label in enumerate(labels)]
+    frame = pd.DataFrame(rows)
+    return HourIndex.build(frame.astype({column: 'category' for column in DIMENSIONS}))
+
+
+def test_unparsed_labels_are_charted_after_the_hours():
+    hours = build(['19:00-20:00', 'Evening', '7 PM-8 PM', '06:00-07:00'])
+    assert hours.histogram().to_dict() == {'06:00-07:00': 40, '19:00-20:00': 40, 'Evening': 20}
+    assert list(hours.histogram()) == [40, 40, 20]
+
+
+def test_hour_ranges_leave_unparsed_labels_out():
+    hours = build(['22:00-23:00', '01:00-02:00', 'Evening', '12:00-13:00'])
+    assert hours.histogram(hours=(22, 2)).to_dict() == {'22:00-23:00': 10, '01:00-02:00': 20}
+    assert list(hours.histogram(hours=(22, 2)).index) == ['22:00-23:00', '01:00-02:00']
+    assert hours.histogram({'Country': 'Japan'}).empty
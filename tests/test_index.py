@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from dataset.index import _intersect
+
+
+@pytest.mark.parametrize('smaller, larger, expected', [
+    ([1, 4, 9], [0, 1, 2, 4, 8, 9], [1, 4, 9]),
+    ([3, 5], [0, 1, 2], []),
+    ([0, 7, 12], [7, 8], [7]),
+    ([2, 10], [], []),
+    ([], [1, 2], []),
+    # Values past the end of larger must not match its first element
+    ([1, 20], [1, 5], [1]),
+])
+def test_intersect(smaller, larger, expected):
+    result = _intersect(np.array(smaller, dtype=np.int64), np.array(larger, dtype=np.int64))
+    assert result.tolist() == expected
+
+
+def test_intersect_matches_numpy():
+    rng = np.random.default_rng(0)
+    smaller = np.unique(rng.integers(0, 1000, 50))
+    larger = np.unique(rng.integers(0, 1000, 400))
+    assert _intersect(smaller, larger).tolist() == np.intersect1d(smaller, larger).tolist()
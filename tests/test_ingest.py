@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from dataset.ingest import iter_records, read_dataset
+
+RECORDS = [
+    {'Country': 'Côte d’Ivoire', 'Sport': 'Athletics', 'Viewership': 10},
+    {'Country': 'Kenya', 'Sport': 'Swimming', 'Viewership': 20},
+    {'Country': '日本', 'Sport': 'Judo', 'Viewership': 30},
+]
+
+
+def split(data, size):
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 64, 1 << 16])
+def test_records_survive_any_chunk_boundary(size):
+    # Sizes of 1 and 2 also cut through the multibyte characters
+    data = json.dumps(RECORDS, ensure_ascii=False, indent=1).encode()
+    assert list(iter_records(split(data, size))) == RECORDS
+
+
+def test_empty_array():
+    assert list(iter_records([b' [ ', b'] '])) == []
+
+
+def test_truncated_input_raises():
+    data = json.dumps(RECORDS).encode()
+    with pytest.raises(ValueError):
+        list(iter_records(split(data[:-10], 5)))
+
+
+def test_missing_closing_bracket_raises():
+    data = json.dumps(RECORDS).encode()
+    with pytest.raises(ValueError):
+        list(iter_records([data[:-1]]))
+
+
+def test_non_array_raises():
+    with pytest.raises(ValueError):
+        list(iter_records([b'{"Country": "Kenya"}']))
+
+
+def test_null_dimension_values_stay_missing():
+    # A null must not be relabelled as another value of its column, and totals over other columns still count it
+    records = [
+        {'Country': 'Kenya', 'Continent': 'Africa', 'Sport': 'Judo', 'Age': '18-24', 'Gender': 'Male',
+         'Referrer': referrer, 'User Agents': 'Chrome', 'Peak Usage Hours': '18:00-19:00', 'Viewership': viewership}
+        for referrer, viewership in [('Google', 12), (None, 5), ('Direct', 3)]
+    ]
+    data = read_dataset([json.dumps(records).encode()], batch_size=2)
+    assert data.frame['Referrer'].isna().tolist() == [False, True, False]
+    assert data.viewership_by('Referrer').to_dict() == {'Direct': 3, 'Google': 12}
+    assert data.viewership_by('Sport').to_dict() == {'Judo': 20}
+    assert data.rows({'Referrer': 'Google'}).tolist() == [0]
+    assert [panel.to_dict() for panel in data.panels([('Referrer', {}), ('Sport', {'Country': 'Kenya'})])] == [{'Direct': 3, 'Google': 12}, {'Judo': 20}]
@@ -0,0 +1,31 @@
+import pytest
+
+from dataset import synthetic
+from dataset.store import Dataset
+from tabs.search import dropdown_options, dropdown_search, search_store
+
+
+@pytest.fixture
+def data():
+    return Dataset.from_records(list(synthetic.generate(1000)))
+
+
+@pytest.fixture
+def threshold():
+    above = dropdown_search['above']
+    yield dropdown_search
+    dropdown_search['above'] = above
+
+
+def test_short_lists_ship_whole_without_a_search_store(data, threshold):
+    threshold['above'] = len(data.values('Country'))
+    assert len(dropdown_options(data, 'Country', ['All Countries'])) == len(data.values('Country')) + 1
+    assert search_store(data, 'country-dropdown', 'Country') == []
+
+
+def test_long_lists_ship_a_page_and_a_search_store(data, threshold):
+    threshold['above'] = 5
+    options = dropdown_options(data, 'Country', ['All Countries'])
+    assert [option['value'] for option in options] == data.values('Country')[:dropdown_search['matches']] + ['All Countries']
+    [store] = search_store(data, 'country-dropdown', 'Country')
+    assert store.id == 'country-dropdown-search'
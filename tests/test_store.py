@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from dataset.ingest import check_records, read_dataset
+from dataset.store import Dataset
+
+RECORD = {
+    'Country': 'Kenya', 'Continent': 'Africa', 'Sport': 'Judo', 'Age': '30', 'Gender': 'Male',
+    'Referrer': 'Google', 'User Agents': 'Chrome', 'Peak Usage Hours': '18:00-19:00', 'Viewership': 12,
+}
+
+
+@pytest.fixture
+def snapshot():
+    records = [RECORD, dict(RECORD, Country='Japan', Continent='Asia', Age='18', Viewership=7)]
+    return read_dataset([json.dumps(records).encode()], etag='"v1"')
+
+
+@pytest.mark.parametrize('records, message', [
+    ({'Country': 'Kenya'}, 'JSON array'),
+    ([1, 2], 'JSON array'),
+    (None, 'JSON array'),
+    ([], 'at least one'),
+    ([{'Country': 'Kenya'}], 'missing'),
+    ([dict(RECORD, Referrer=None)], 'null Referrer'),
+    ([dict(RECORD, Viewership=None)], 'null Viewership'),
+])
+def test_check_records_rejects(records, message):
+    with pytest.raises(ValueError, match=message):
+        check_records(records)
+
+
+def test_extend_with_numeric_dimension_values(snapshot):
+    # JSON numbers land in the same string categories as the snapshot's labels
+    check_records([dict(RECORD, Age=30, Viewership=5)])
+    extended = snapshot.extend(Dataset.from_records([dict(RECORD, Age=30, Viewership=5)]))
+    assert len(extended) == 3
+    assert extended.viewership_by('Age').to_dict() == {'18': 7, '30': 17}
+    assert extended.summary.total == 24
+
+
+def test_extend_keeps_the_etag_and_changes_the_fingerprint(snapshot):
+    extended = snapshot.extend(Dataset.from_records([RECORD]))
+    assert extended.etag == snapshot.etag
+    assert extended.fingerprint != snapshot.fingerprint
+    assert extended.fingerprint != snapshot.extend(Dataset.from_records([dict(RECORD, Viewership=1)])).fingerprint
@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+
+from dataset.summary import SummaryStats
+
+FRAME = pd.DataFrame({
+    'Continent': pd.Categorical(['Africa', 'Europe', 'Africa', 'Asia', 'Europe', 'Asia']),
+    'Sport': pd.Categorical(['Judo', 'Judo', 'Rowing', 'Swimming', 'Rowing', 'Judo']),
+    'Viewership': [5, 40, 12, 7, 30, 1],
+})
+
+
+def assert_same(left, right):
+    assert left.rows == right.rows
+    assert left.total == right.total
+    assert left.maximum == right.maximum
+    assert left.minimum == right.minimum
+    pd.testing.assert_series_equal(left.by_continent.sort_index(), right.by_continent.sort_index(), check_names=False)
+    pd.testing.assert_series_equal(left.by_sport.sort_index(), right.by_sport.sort_index(), check_names=False)
+
+
+@pytest.mark.parametrize('split', [0, 1, 3, 6])
+def test_merge_matches_from_frame(split):
+    # Categories missing from either half, and an empty half, must merge like the whole frame
+    head = FRAME.iloc[:split].copy()
+    tail = FRAME.iloc[split:].copy()
+    merged = SummaryStats.from_frame(head).merge(SummaryStats.from_frame(tail))
+    assert_same(merged, SummaryStats.from_frame(FRAME))
+
+
+def test_average():
+    assert SummaryStats.from_frame(FRAME).average == pytest.approx(95 / 6)
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataset.topn import OTHER, top_n
+
+VALUES = pd.Series([5, 50, 1, 30, 2], index=pd.Index(['a', 'b', 'c', 'd', 'e'], name='Country'), name='Viewership')
+ERRORS = pd.Series([3.0, 4.0, 1.0, 2.0, 2.0], index=VALUES.index, name='Viewership')
+
+
+def test_short_series_is_unchanged():
+    values, errors = top_n(VALUES, 5, ERRORS)
+    assert values is VALUES and errors is ERRORS
+    assert top_n(VALUES, None) == (VALUES, None)
+
+
+def test_tail_folds_into_other_in_original_order():
+    values, errors = top_n(VALUES, 3)
+    assert values.to_dict() == {'b': 50, 'd': 30, OTHER: 8}
+    assert values.index.name == 'Country' and values.name == 'Viewership'
+    assert values.sum() == VALUES.sum()
+    assert errors is None
+
+
+def test_other_errors_combine_in_quadrature():
+    values, errors = top_n(VALUES, 3, ERRORS)
+    assert errors.index.tolist() == values.index.tolist()
+    assert errors['b'] == 4.0 and errors['d'] == 2.0
+    assert errors[OTHER] == pytest.approx(np.sqrt(3.0 ** 2 + 1.0 ** 2 + 2.0 ** 2))
+
+
+def test_without_other_drops_the_tail():
+    values, errors = top_n(VALUES, 2, ERRORS, other=False)
+    assert values.to_dict() == {'b': 50, 'd': 30}
+    assert errors.to_dict() == {'b': 4.0, 'd': 2.0}
+    values, errors = top_n(VALUES, 2, other=False)
+    assert errors is None